@@ -1,32 +1,37 @@
 from datetime import datetime
 from student_system import Student
 from course import Course
-import json
+from concurrency import update_with_retry
 class Attendance:
 
     #mark attendance of a student in a specific course in Professor mode
     def mark_attendance(self, student, course_id, is_present, filename):
         self.attendance_marked = False
-        with open(filename, 'r') as file:
-            data = json.load(file)
-        if student.student_id not in data['students']:
-            print(f"Student with ID {student.student_id} not found.")
-            return
-        if course_id not in student.courses_reg:
+        if course_id not in student.course_codes():
             print("Student not enrolled in this course!")
             return
-        if course_id not in data['courses']:
-            print("Course not found!")
-            return
-
-        if 'attendance' not in student.courses_reg[course_id]:
-            student.courses[course_id]['attendance'] = []
 
         date = datetime.now().strftime("%Y-%m-%d")
-        student.courses[course_id]['attendance'].append({
+        entry = {
             'date': date,
             'present': is_present
-        })
+        }
+
+        def append_entry(record):
+            # appends commute, so a lost version race is simply retried
+            record.setdefault('attendance', {}).setdefault(course_id, []).append(entry)
+            return record
+
+        result = update_with_retry(filename, 'students', student.student_id, append_entry)
+        if result is None:
+            print(f"Student with ID {student.student_id} not found.")
+            return
+        record, base_version = result
+        student.add_attendance(course_id, date, is_present)
+        # A retry merged other writers' changes we do not have in memory,
+        # so keep the old version and let strict writes see we are stale
+        if base_version == student.version:
+            student.version = record['version']
         status = "present" if is_present else "absent"
         print(f"Marked {student.name} as {status} on {date}")
         self.attendance_marked = True
@@ -38,11 +43,11 @@ class Attendance:
             print("Student not found!")
             return None
 
-        if course_id not in student.courses_reg:
+        if course_id not in student.course_codes():
             print("Student not enrolled in this course!")
             return None
 
-        attendance = student.courses_reg[course_id].get('attendance', [])
+        attendance = student.attendance.get(course_id, [])
         if not attendance:
             print("No attendance records found")
             return None
@@ -0,0 +1,429 @@
+# cli.py
+# Non-interactive command line, for scripts and cron jobs.
+#
+#   python cli.py register S12345 CS101
+#   python cli.py grade S12345 CS101 3.7
+#   python cli.py mark-attendance S12345 CS101 present --date 2025-01-06
+#   python cli.py report --student S12345
+#   python cli.py report --top 10 --department "Computer Science"
+#   python cli.py report --course CS101 --trend week --from 2025-01-01
+#   python cli.py report --department Physics --trend term --metric grade
+#   python cli.py batch commands.txt --commit-every 500
+#   some_script | python cli.py batch -
+#
+# The data file is loaded into one College once, every command runs
+# against it in memory, and the changed records are written back with a
+# version check (see concurrency.py) at the end, or every N commands in
+# batch mode. If someone else wrote one of those records in the meantime,
+# registrations, drops and attendance marks are replayed on the newer
+# records; a grade is only replayed if nobody changed that grade. A batch
+# file holds one command per line, written the same way as on the command
+# line; blank lines and lines starting with # are skipped.
+import argparse
+import os
+import shlex
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import date, datetime
+
+import config
+from college import College
+from concurrency import commit_many, contention_stats, update_many_with_retry, VersionConflict
+from datastore import load_data
+from gpa_index import GPAIndex
+from grading_system import Grading
+from timeseries import TimeSeriesStore
+
+
+COMMANDS = ("register", "drop", "grade", "mark-attendance", "report")
+
+
+class CommandError(Exception):
+    """A single command could not be applied."""
+
+
+class _CommandParser(argparse.ArgumentParser):
+    # argparse exits the program on a bad command, a batch should go on
+    def error(self, message):
+        raise CommandError(message)
+
+
+def _build_command_parser():
+    parser = _CommandParser(prog="cli.py", add_help=False)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    register = commands.add_parser("register", help="register a student for a course")
+    register.add_argument("student_id")
+    register.add_argument("course_code")
+
+    drop = commands.add_parser("drop", help="drop a course for a student")
+    drop.add_argument("student_id")
+    drop.add_argument("course_code")
+
+    grade = commands.add_parser("grade", help="assign a grade")
+    grade.add_argument("student_id")
+    grade.add_argument("course_code")
+    grade.add_argument("grade", type=float)
+
+    attendance = commands.add_parser("mark-attendance", help="record attendance")
+    attendance.add_argument("student_id")
+    attendance.add_argument("course_code")
+    attendance.add_argument("status", choices=["present", "absent"])
+    attendance.add_argument("--date", help="YYYY-MM-DD, defaults to today")
+
+    report = commands.add_parser("report", help="print a student, a course or a summary")
+    report.add_argument("--student", dest="student_id")
+    report.add_argument("--course", dest="course_code")
+    report.add_argument("--top", type=int, metavar="N", help="the N best GPAs")
+    report.add_argument("--department", help="limit --top or --trend to one department")
+    report.add_argument("--trend", choices=["day", "week", "term"],
+                        help="trend of the course, student, department or college")
+    report.add_argument("--metric", choices=["attendance", "grade"], default="attendance",
+                        help="what --trend shows (default: %(default)s)")
+    report.add_argument("--from", dest="start", help="first date of --trend, YYYY-MM-DD")
+    report.add_argument("--to", dest="end", help="last date of --trend, YYYY-MM-DD")
+
+    return parser
+
+
+class CommandRunner:
+    """Runs commands against one loaded College and commits the changes."""
+
+    def __init__(self, filename, out=None, college=None):
+        self.filename = filename
+        self.out = out if out is not None else sys.stdout
+        # college is for running commands against one already in memory
+        self.college = college if college is not None else College.from_data(load_data(filename))
+        self.parser = _build_command_parser()
+        self.dirty = {}  # {(section, entity_id): entity} changed since the last commit
+        # {(section, entity_id): [change]}, to replay the changes on a newer
+        # record if the commit loses a version race, see _apply_change()
+        self.changes = {}
+        self._gpa_index = None
+        self._history = None
+        self.commits = 0
+        self.ok = 0
+        self.failed = 0
+        self.replays = 0  # commits that had to be replayed on newer records
+        self.lost_grades = 0  # grades not saved because someone else changed them
+
+    def _student(self, student_id):
+        student = self.college.students.get(student_id)
+        if student is None:
+            raise CommandError(f"Student with ID {student_id} not found")
+        return student
+
+    def _course(self, course_code):
+        course = self.college.courses.get(course_code)
+        if course is None:
+            raise CommandError(f"Course {course_code} not found")
+        return course
+
+    @property
+    def gpa_index(self):
+        # Only built when a report needs it, then kept current by grade changes
+        if self._gpa_index is None:
+            self._gpa_index = GPAIndex.build(self.college)
+        return self._gpa_index
+
+    @property
+    def history(self):
+        if self._history is None:
+            self._history = TimeSeriesStore.build(self.college)
+        return self._history
+
+    def _touch(self, entity_key, entity, change):
+        self.dirty[entity_key] = entity
+        self.changes.setdefault(entity_key, []).append(change)
+
+    def do_register(self, args):
+        student = self._student(args.student_id)
+        course = self._course(args.course_code)
+        if course in student.courses_reg:
+            raise CommandError(f"{student.student_id} already registered for {course.course_code}")
+        if len(student.courses_reg) >= config.MAX_COURSES:
+            raise CommandError(f"{student.student_id} already has {config.MAX_COURSES} courses")
+        try:
+            too_low = int(student.level) < int(course.level)
+        except ValueError:
+            raise CommandError(f"Invalid level for {student.student_id} or {course.course_code}")
+        if too_low:
+            raise CommandError(f"{course.course_code} is not available for level {student.level}")
+        student.register_course(course)
+        self._touch(("students", student.student_id), student, ("register", course.course_code))
+        self._touch(("courses", course.course_code), course,
+                    ("enroll", student.student_id, dict(course.enrolled_students[student.student_id])))
+
+    def do_drop(self, args):
+        student = self._student(args.student_id)
+        course = self._course(args.course_code)
+        if not student.drop_course(course):
+            raise CommandError(f"{student.student_id} not registered for {course.course_code}")
+        self._touch(("students", student.student_id), student, ("drop", course.course_code))
+        self._touch(("courses", course.course_code), course, ("unenroll", student.student_id))
+
+    def do_grade(self, args):
+        student = self._student(args.student_id)
+        course = self._course(args.course_code)
+        previous = student.grades.get(course.course_code)
+        if not Grading.assign_grade(student, course, args.grade):
+            raise CommandError(f"{student.student_id} not registered for {course.course_code}")
+        self._touch(("students", student.student_id), student,
+                    ("grade", course.course_code, previous, dict(student.grade_history[-1])))
+
+    def do_mark_attendance(self, args):
+        student = self._student(args.student_id)
+        course = self._course(args.course_code)
+        if course not in student.courses_reg:
+            raise CommandError(f"{student.student_id} not registered for {course.course_code}")
+        if args.date:
+            try:
+                day = date.fromisoformat(args.date).isoformat()
+            except ValueError:
+                raise CommandError(f"Invalid date {args.date!r}, use YYYY-MM-DD")
+        else:
+            day = datetime.now().strftime("%Y-%m-%d")
+        entry = student.add_attendance(course.course_code, day, args.status == "present")
+        self._touch(("students", student.student_id), student,
+                    ("attendance", course.course_code, dict(entry)))
+
+    def do_report(self, args):
+        out = self.out
+        if args.trend:
+            if args.course_code:
+                by, key = "course", args.course_code
+            elif args.student_id:
+                by, key = "student", args.student_id
+            elif args.department:
+                by, key = "department", args.department
+            else:
+                by, key = "college", None
+            trend = self.history.grade_trend if args.metric == "grade" else self.history.attendance_trend
+            try:
+                rows = trend(by, key, args.trend, args.start, args.end)
+            except ValueError as error:
+                raise CommandError(str(error))
+            if args.metric == "grade":
+                for label, average, count in rows:
+                    print(f"{label}  average grade {average:.2f} over {count} grades", file=out)
+            else:
+                for label, present, records, rate in rows:
+                    print(f"{label}  {present}/{records} present ({rate:.0%})", file=out)
+        elif args.top is not None:
+            for position, (student_id, gpa) in enumerate(
+                    self.gpa_index.top(args.top, args.department), 1):
+                print(f"{position}. {student_id} gpa={gpa:.2f}", file=out)
+        elif args.student_id:
+            student = self._student(args.student_id)
+            grades = student.grades
+            index = self.gpa_index
+            rank = index.rank(student.student_id, student.department)
+            percentile = index.percentile(student.student_id, student.department)
+            print(f"{student.student_id} {student.name} level={student.level} "
+                  f"department={student.department} gpa={student.gpa():.2f} "
+                  f"department rank={rank} percentile={percentile:.1f}", file=out)
+            for course in student.courses_reg:
+                records = student.attendance.get(course.course_code, [])
+                present = sum(1 for r in records if r['present'])
+                print(f"  {course.course_code} grade={grades.get(course.course_code, 0)} "
+                      f"attendance={present}/{len(records)}", file=out)
+        elif args.course_code:
+            course = self._course(args.course_code)
+            print(f"{course.course_code} {course.course_name} professor={course.professor} "
+                  f"enrolled={course.no_enrolled()}", file=out)
+            for student_id in course.enrolled_students:
+                print(f"  {student_id}", file=out)
+        else:
+            print(f"{self.college.name}: {len(self.college.students)} students, "
+                  f"{len(self.college.professors)} professors, "
+                  f"{len(self.college.courses)} courses", file=out)
+
+    def close(self):
+        """Stop the report indexes from listening to the college."""
+        if self._gpa_index is not None:
+            self._gpa_index.detach()
+        if self._history is not None:
+            self._history.detach()
+
+    def execute(self, argv):
+        """Run one command, given as a list of arguments."""
+        args = self.parser.parse_args(argv)
+        handler = getattr(self, "do_" + args.command.replace("-", "_"))
+        handler(args)
+
+    def _apply_change(self, record, change, lost):
+        """Redo one change on a newer copy of its record."""
+        kind = change[0]
+        if kind == "register":
+            code = change[1]
+            if code not in record.setdefault('courses_reg', []):
+                record['courses_reg'].append(code)
+                record.setdefault('grades', {})[code] = 0
+                record.setdefault('attendance', {}).setdefault(code, [])
+        elif kind == "drop":
+            if change[1] in record.get('courses_reg', []):
+                record['courses_reg'].remove(change[1])
+        elif kind == "enroll":
+            record.setdefault('enrolled_students', {})[change[1]] = change[2]
+        elif kind == "unenroll":
+            record.get('enrolled_students', {}).pop(change[1], None)
+        elif kind == "attendance":
+            record.setdefault('attendance', {}).setdefault(change[1], []).append(change[2])
+        elif kind == "grade":
+            _, code, previous, entry = change
+            grades = record.setdefault('grades', {})
+            # Overwriting a grade does not commute: only redo it if the
+            # grade we replaced is still the one on disk
+            if grades.get(code) == previous:
+                grades[code] = entry['grade']
+                record.setdefault('grade_history', []).append(entry)
+            else:
+                lost.append((record['student_id'], code, entry, grades.get(code)))
+
+    def _replay(self, entities):
+        """Redo the changes since the last commit on the records as they are now."""
+        keys = [entity_key for entity_key, _ in entities]
+        lost = []
+
+        def mutate(records):
+            lost.clear()
+            for entity_key, record in zip(keys, records):
+                for change in self.changes.get(entity_key, ()):
+                    self._apply_change(record, change, lost)
+            return records
+
+        result = update_many_with_retry(self.filename, keys, mutate)
+        if result is None:
+            return False
+        records, base_versions = result
+        for (_, entity), record, base in zip(entities, records, base_versions):
+            # Other writers' changes are now on disk but not in memory, keep
+            # the old version so the next commit replays again
+            if base == entity.version:
+                entity.version = record['version']
+        for student_id, code, entry, current in lost:
+            self.failed += 1
+            self.lost_grades += 1
+            self.college.students[student_id].retract_grade(entry, current)
+            print(f"Grade {entry['grade']} for {student_id} in {code} not saved, "
+                  f"someone else changed it to {current}", file=sys.stderr)
+        return True
+
+    def commit(self):
+        """
+        Write every changed record in one version-checked write. On a
+        version conflict the changes are replayed on the newer records;
+        raises VersionConflict if even that fails.
+        """
+        if not self.dirty:
+            return
+        entities = list(self.dirty.items())
+        updates = [(section, entity_id, entity.version, entity.to_dict())
+                   for (section, entity_id), entity in entities]
+        try:
+            versions = commit_many(self.filename, updates)
+        except VersionConflict:
+            self.replays += 1
+            if not self._replay(entities):
+                raise
+        else:
+            for (_, entity), version in zip(entities, versions):
+                entity.version = version
+        self.dirty.clear()
+        self.changes.clear()
+        self.commits += 1
+
+    def run_batch(self, lines, commit_every=0):
+        """
+        Run one command per line, committing every commit_every successful
+        commands (0 means only once at the end). Returns the elapsed time.
+        """
+        start = time.perf_counter()
+        pending = 0
+        for line_no, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                self.execute(shlex.split(line))
+            except (CommandError, ValueError) as error:
+                self.failed += 1
+                print(f"line {line_no}: {error}", file=sys.stderr)
+                continue
+            self.ok += 1
+            pending += 1
+            if commit_every and pending >= commit_every:
+                self.commit()
+                pending = 0
+        self.commit()
+        return time.perf_counter() - start
+
+
+def _print_stats(runner, elapsed, out):
+    total = runner.ok + runner.failed
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"{total} commands ({runner.ok} ok, {runner.failed} failed) "
+          f"in {elapsed:.3f}s, {rate:.0f} commands/s, {runner.commits} commits", file=out)
+    print(f"{contention_stats['conflicts']} version conflicts, {runner.replays} commits replayed, "
+          f"{contention_stats['retries']} retries, {runner.lost_grades} grades not saved", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Run University Management System commands without the menus.",
+    )
+    parser.add_argument("--data", default=config.DATA_FILE, help="data file (default: %(default)s)")
+    parser.add_argument("--verbose", action="store_true", help="show the messages printed by the model")
+    parser.add_argument("command", choices=COMMANDS + ("batch",))
+    parser.add_argument("args", nargs=argparse.REMAINDER,
+                        help="command arguments, see the examples at the top of cli.py")
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        batch_parser = argparse.ArgumentParser(prog="cli.py batch")
+        batch_parser.add_argument("file", nargs="?", default="-", help="command file, - for stdin")
+        batch_parser.add_argument("--commit-every", type=int, default=0, metavar="N",
+                                  help="commit after every N successful commands (default: only at the end)")
+        batch_args = batch_parser.parse_args(args.args)
+
+    if not os.path.exists(args.data):
+        print(f"Data file {args.data} not found, run main.py once to create it.", file=sys.stderr)
+        return 1
+
+    out = sys.stdout
+    runner = CommandRunner(args.data, out=out)
+    # The model classes print a line for every change, which would drown
+    # the output of a large batch
+    sink = sys.stdout if args.verbose else open(os.devnull, 'w')
+    try:
+        with redirect_stdout(sink):
+            if args.command == "batch":
+                if batch_args.file == "-":
+                    elapsed = runner.run_batch(sys.stdin, batch_args.commit_every)
+                else:
+                    with open(batch_args.file, 'r') as file:
+                        elapsed = runner.run_batch(file, batch_args.commit_every)
+            else:
+                runner.execute([args.command] + args.args)
+                runner.commit()
+    except CommandError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    except VersionConflict as error:
+        print(f"Conflict: {error}. Someone else changed this record, "
+              f"changes since the last commit were not saved.", file=sys.stderr)
+        return 1
+    finally:
+        runner.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    if args.command == "batch":
+        _print_stats(runner, elapsed, out)
+    # A grade that lost a version race counts as failed even for one command
+    return 1 if runner.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
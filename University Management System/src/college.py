@@ -1,12 +1,49 @@
 from student_system import Student
 from department import Department
 from professor import Professor
+from course import Course
 class College:
     def __init__(self, name):
         self.name = name
         self.departments = {}
         self.students = {}
         self.professors = {}
+        self.courses = {}
+        # Listeners for the grades and attendance of this college's
+        # students only, shared by reference with every Student in it
+        self.grade_listeners = []
+        self.attendance_listeners = []
+        self.grade_retracted_listeners = []
+        # Called as listener(student) after remove_student()
+        self.student_removed_listeners = []
+
+    def _link_student(self, student):
+        student.grade_listeners = self.grade_listeners
+        student.attendance_listeners = self.attendance_listeners
+        student.grade_retracted_listeners = self.grade_retracted_listeners
+
+    def _listener_lists(self, grade, attendance, grade_retracted, student_removed):
+        return ((self.grade_listeners, grade),
+                (self.attendance_listeners, attendance),
+                (self.grade_retracted_listeners, grade_retracted),
+                (self.student_removed_listeners, student_removed))
+
+    def attach_listeners(self, grade=None, attendance=None, grade_retracted=None, student_removed=None):
+        """
+        Call grade(student, course_id), attendance(student, course_id, entry),
+        grade_retracted(student, course_id, entry) and student_removed(student)
+        on changes.
+        """
+        for student in self.students.values():
+            self._link_student(student)
+        for listeners, listener in self._listener_lists(grade, attendance, grade_retracted, student_removed):
+            if listener is not None and listener not in listeners:
+                listeners.append(listener)
+
+    def detach_listeners(self, grade=None, attendance=None, grade_retracted=None, student_removed=None):
+        for listeners, listener in self._listener_lists(grade, attendance, grade_retracted, student_removed):
+            if listener in listeners:
+                listeners.remove(listener)
     
     def add_department(self, department):
         if department.name not in self.departments:
@@ -14,6 +51,30 @@ class College:
         else:
             print(f"Department {department.name} already exists.")
     
+    def add_course(self, course):
+        if course.course_code in self.courses:
+            print(f"Course {course.course_code} already exists")
+            return False
+
+        self.courses[course.course_code] = course
+        return True
+
+    def assign_professor(self, course_code, professor_id):
+        # Updates both Course.professor and Professor.courses, taking the
+        # course away from whoever taught it before
+        course = self.get_course(course_code)
+        professor = self.get_professor(professor_id)
+        if course is None or professor is None:
+            return False
+
+        previous_id = getattr(course.professor, "professor_id", course.professor)
+        previous = self.professors.get(previous_id)
+        if previous is not None and previous is not professor:
+            previous.remove_course(course_code)
+        course.assign_professor(professor_id)
+        professor.add_course(course_code)
+        return True
+
     def add_professor(self, professor):
         if professor.professor_id in self.professors:
             print(f"Professor with ID {professor.professor_id} already exists")
@@ -30,12 +91,15 @@ class College:
             return False
         
         self.students[student.student_id] = student
+        self._link_student(student)
         print(f"Student {student.name} added to {self.name}")
         return True
     
     def remove_student(self, student_id):
         if student_id in self.students:
-            del self.students[student_id]
+            student = self.students.pop(student_id)
+            for listener in self.student_removed_listeners:
+                listener(student)
             print(f"Student with ID {student_id} removed from {self.name}")
             return True
         else:
@@ -56,6 +120,13 @@ class College:
             print(f"Professor with ID {professor_id} not found")
             return None
     
+    def get_course(self, course_code):
+        if course_code in self.courses:
+            return self.courses[course_code]
+        else:
+            print(f"Course {course_code} not found")
+            return None
+
     def get_department(self, department_name):
         if department_name in self.departments:
             return self.departments[department_name]
@@ -68,6 +139,9 @@ class College:
     
     def get_all_professors(self):
         return list(self.professors.values())
+
+    def get_all_courses(self):
+        return list(self.courses.values())
     
     def to_dict(self):
         return {
@@ -75,9 +149,63 @@ class College:
             "departments": {name: department.to_dict() for name, department in self.departments.items()},
             "students": {student_id: student.to_dict() for student_id, student in self.students.items()},
             "professors": {professor_id: professor.to_dict() for professor_id, professor in self.professors.items()},
+            "courses": {course_code: course.to_dict() for course_code, course in self.courses.items()},
         }
     
     @classmethod
     def from_dict(cls, data):
         college = cls(data["name"])
         return college
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Build a fully linked College from the whole data file.
+        Sections may be lists (as written by main.py) or dicts keyed by ID
+        (as written by registration.py). The mutable parts of each record
+        are copied, so data itself is never modified.
+        """
+        college = cls(data.get("college", {}).get("name", ""))
+
+        for record in _records(data.get("courses")):
+            course = Course.from_dict(record)
+            if isinstance(course.professor, dict):
+                course.professor = course.professor.get("professor_id")
+            course.enrolled_students = dict(course.enrolled_students)
+            college.courses[course.course_code] = course
+
+        for record in _records(data.get("departments")):
+            codes = [c["course_code"] if isinstance(c, dict) else c for c in record.get("courses", [])]
+            college.departments[record["name"]] = Department(record["name"], codes)
+
+        for record in _records(data.get("professors")):
+            professor = Professor.from_dict(record)
+            professor.courses = list(professor.courses)
+            college.professors[professor.professor_id] = professor
+
+        for student_id, record in _keyed_records(data.get("students"), "student_id"):
+            student = Student(record["name"], student_id, record["level"], record["department"])
+            codes = record.get("courses_reg", record.get("courses", []))
+            student.courses_reg = [college.courses[code] for code in codes if code in college.courses]
+            student.grades = dict(record.get("grades", {}))
+            student.attendance = {code: entries.copy() for code, entries in record.get("attendance", {}).items()}
+            student.grade_history = list(record.get("grade_history", []))
+            student.version = record.get("version", 0)
+            college._link_student(student)
+            college.students[student_id] = student
+
+        return college
+
+
+def _records(section):
+    if section is None:
+        return []
+    if isinstance(section, dict):
+        return list(section.values())
+    return section
+
+
+def _keyed_records(section, id_key):
+    if isinstance(section, dict):
+        return list(section.items())
+    return [(record[id_key], record) for record in _records(section)]
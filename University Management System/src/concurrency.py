@@ -0,0 +1,234 @@
+# concurrency.py
+# Optimistic concurrency control for the JSON data file.
+#
+# Every Student, Course and Professor record carries a "version" stamp.
+# A writer remembers the version it read, and its write only goes through
+# if the record still has that version on disk (compare-and-swap). The
+# file lock below is only held for the few milliseconds of the
+# compare + write, never while a user is typing at a prompt, so many
+# writers can work at the same time.
+import copy
+import json
+import os
+from contextlib import contextmanager
+
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl, lock with msvcrt instead
+    fcntl = None
+    import msvcrt
+
+# Key used to identify a record in each section of the data file
+ID_KEYS = {
+    "students": "student_id",
+    "professors": "professor_id",
+    "courses": "course_code",
+}
+
+# Contention metric, see contention_rate() / print_contention_report()
+contention_stats = {
+    "attempts": 0,   # compare-and-swap attempts
+    "commits": 0,    # attempts that were written
+    "conflicts": 0,  # attempts rejected because the version had moved on
+    "retries": 0,    # automatic retries of commutative operations
+    "gave_up": 0,    # commutative operations that ran out of retries
+}
+
+
+class VersionConflict(Exception):
+    """Raised when a record changed on disk since it was read."""
+
+    def __init__(self, section, entity_id, expected, actual):
+        self.section = section
+        self.entity_id = entity_id
+        self.expected = expected
+        self.actual = actual
+        super().__init__(
+            f"{section}/{entity_id} is at version {actual}, expected {expected}"
+        )
+
+
+@contextmanager
+def _file_lock(filename):
+    with open(filename + ".lock", "a+") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            # LK_LOCK only waits about 10 seconds before raising, keep waiting
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _read(filename):
+    with open(filename, 'r') as file:
+        return json.load(file)
+
+
+def _write(filename, data, cls=None):
+    # Write to a temp file and rename, so readers never see half a file.
+    # The temp name is per process, so a writer that does not hold the
+    # lock can never rename another writer's half-written file.
+    tmp_name = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_name, 'w') as file:
+        json.dump(data, file, indent=4, cls=cls)
+    os.replace(tmp_name, filename)
+
+
+def write_file(filename, data, cls=None):
+    """Replace the whole data file, under the same lock as the record writes."""
+    with _file_lock(filename):
+        _write(filename, data, cls)
+
+
+def _find(data, section, entity_id):
+    """Return the record for entity_id, the section may be a dict or a list."""
+    records = data.get(section, {})
+    if isinstance(records, dict):
+        return records.get(entity_id)
+    id_key = ID_KEYS[section]
+    return next((r for r in records if r.get(id_key) == entity_id), None)
+
+
+def _store(data, section, entity_id, record):
+    records = data.setdefault(section, {})
+    if isinstance(records, dict):
+        records[entity_id] = record
+        return
+    id_key = ID_KEYS[section]
+    for i, existing in enumerate(records):
+        if existing.get(id_key) == entity_id:
+            records[i] = record
+            return
+    records.append(record)
+
+
+def record_version(record):
+    """Version of a record as read from disk, None if it does not exist."""
+    if record is None:
+        return None
+    return record.get("version", 0)
+
+
+def read_record(filename, section, entity_id):
+    """Return (record, version) for one entity, version is None if missing."""
+    record = _find(_read(filename), section, entity_id)
+    return record, record_version(record)
+
+
+def commit_many(filename, updates):
+    """
+    Compare-and-swap several records in one write.
+    updates is a list of (section, entity_id, expected_version, record),
+    use expected_version None to insert a record that must not exist yet.
+    Nothing is written unless every expected version still matches.
+    Returns the list of new versions.
+    """
+    contention_stats["attempts"] += 1
+    with _file_lock(filename):
+        data = _read(filename)
+        for section, entity_id, expected, _ in updates:
+            actual = record_version(_find(data, section, entity_id))
+            if actual != expected:
+                contention_stats["conflicts"] += 1
+                raise VersionConflict(section, entity_id, expected, actual)
+
+        new_versions = []
+        for section, entity_id, expected, record in updates:
+            record = dict(record)
+            record["version"] = (expected or 0) + 1
+            _store(data, section, entity_id, record)
+            new_versions.append(record["version"])
+        _write(filename, data)
+    contention_stats["commits"] += 1
+    return new_versions
+
+
+def compare_and_swap(filename, section, entity_id, expected_version, record):
+    """Write one record if it is still at expected_version, return the new version."""
+    return commit_many(filename, [(section, entity_id, expected_version, record)])[0]
+
+
+def update_many_with_retry(filename, keys, mutate, retries=None):
+    """
+    Read the records for keys, a list of (section, entity_id), apply
+    mutate(records) -> records and commit them together, re-reading and
+    retrying on a version conflict. Only use this for commutative
+    operations (appends, set membership) where re-applying mutate to the
+    newer records gives the right answer.
+    Returns (records, base_versions), where base_versions are the versions
+    mutate was applied to: if they differ from what the caller held in
+    memory, the committed records include other writers' changes.
+    Returns None if any entity does not exist or every retry lost the race.
+    """
+    if retries is None:
+        retries = config.MAX_WRITE_RETRIES
+    for attempt in range(retries + 1):
+        data = _read(filename)
+        records = [_find(data, section, entity_id) for section, entity_id in keys]
+        if any(record is None for record in records):
+            return None
+        base_versions = [record_version(record) for record in records]
+        new_records = mutate([copy.deepcopy(record) for record in records])
+        updates = [(section, entity_id, version, record)
+                   for (section, entity_id), version, record
+                   in zip(keys, base_versions, new_records)]
+        try:
+            versions = commit_many(filename, updates)
+        except VersionConflict:
+            if attempt < retries:
+                contention_stats["retries"] += 1
+            continue
+        for record, version in zip(new_records, versions):
+            record["version"] = version
+        return new_records, base_versions
+    contention_stats["gave_up"] += 1
+    names = ", ".join(f"{section}/{entity_id}" for section, entity_id in keys)
+    print(f"Gave up writing {names} after {retries} retries.")
+    return None
+
+
+def update_with_retry(filename, section, entity_id, mutate, retries=None):
+    """
+    Single-record form of update_many_with_retry, mutate(record) -> record.
+    Returns (record, base_version) or None.
+    """
+    result = update_many_with_retry(
+        filename, [(section, entity_id)], lambda records: [mutate(records[0])], retries
+    )
+    if result is None:
+        return None
+    return result[0][0], result[1][0]
+
+
+def contention_rate():
+    """Fraction of compare-and-swap attempts that hit a conflict."""
+    if contention_stats["attempts"] == 0:
+        return 0.0
+    return contention_stats["conflicts"] / contention_stats["attempts"]
+
+
+def reset_contention_stats():
+    for key in contention_stats:
+        contention_stats[key] = 0
+
+
+def print_contention_report():
+    print("\n--- Write Contention ---")
+    for key, value in contention_stats.items():
+        print(f"{key}: {value}")
+    print(f"conflict rate: {contention_rate():.1%}")
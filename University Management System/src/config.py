@@ -18,4 +18,22 @@ GRADE_POINTS = {
 }
 
 # Minimum attendance percentage required
-MIN_ATTENDANCE = 75
\ No newline at end of file
+MIN_ATTENDANCE = 75
+
+# How many times a commutative write (e.g. an attendance append) is retried
+# after losing a version race before giving up
+MAX_WRITE_RETRIES = 5
+
+# Data file used by main.py and the batch tools
+DATA_FILE = "college_data.json"
+
+# Cold-start budget in milliseconds for `python main.py` up to the first
+# menu, checked by startup_bench.py
+STARTUP_BUDGET_MS = 150
+
+# Teaching week used by scheduler.py: days and lecture start hours
+SCHEDULE_DAYS = ["Sun", "Mon", "Tue", "Wed", "Thu"]
+SCHEDULE_START_HOURS = [8, 10, 12, 14, 16, 18]
+
+# Seconds the scheduler may spend improving on its first timetable
+SCHEDULE_TIME_BUDGET = 5.0
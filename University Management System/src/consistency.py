@@ -0,0 +1,177 @@
+# consistency.py
+# Checks that the cross-references in a College agree with each other,
+# and with the derived structures built on top of them:
+#   - Student.courses_reg  <-> Course.enrolled_students
+#   - Professor.courses    <-> Course.professor
+#   - Department.courses   ->  College.courses
+#   - GPAIndex entries     ->  Student.gpa(), department and level
+#   - TimeSeriesStore      ->  number of attendance records and dated grades
+#
+# check_all() looks at everything in one linear pass. After a single
+# mutation, check_mutation() only looks at the records it touched.
+import config
+
+
+def _code(course):
+    # courses_reg holds Course objects once linked, codes straight from a file
+    return getattr(course, "course_code", course)
+
+
+def _professor_id(professor):
+    return getattr(professor, "professor_id", professor)
+
+
+def _attendance_records(student):
+    return sum(len(entries) for entries in student.attendance.values())
+
+
+def _series_count(history, dimension, key, metric="attendance"):
+    series = history.series.get((metric, dimension, key, "term"))
+    if series is None:
+        return 0
+    return sum(count for _, _, count in series.range())
+
+
+class ConsistencyChecker:
+    def __init__(self, college, gpa_index=None, history=None):
+        self.college = college
+        self.gpa_index = gpa_index
+        self.history = history
+
+    def check_student(self, student_id):
+        problems = []
+        college = self.college
+        student = college.students.get(student_id)
+        if student is None:
+            if self.gpa_index is not None and student_id in self.gpa_index.entries:
+                problems.append(f"GPA index still has removed student {student_id}")
+            return problems
+
+        codes = [_code(course) for course in student.courses_reg]
+        if len(codes) != len(set(codes)):
+            problems.append(f"{student_id} is registered twice for the same course: {codes}")
+        if len(codes) > config.MAX_COURSES:
+            problems.append(f"{student_id} has {len(codes)} courses, more than {config.MAX_COURSES}")
+        for course in student.courses_reg:
+            code = _code(course)
+            known = college.courses.get(code)
+            if known is None:
+                problems.append(f"{student_id} is registered for unknown course {code}")
+            elif course is not known and not isinstance(course, str):
+                problems.append(f"{student_id} holds a stale copy of course {code}")
+            elif student_id not in known.enrolled_students:
+                problems.append(f"{student_id} has {code} in courses_reg but is not in its enrolled_students")
+
+        if self.gpa_index is not None:
+            entry = self.gpa_index.entries.get(student_id)
+            expected_names = (None, student.department, (student.department, student.level))
+            if entry is None:
+                problems.append(f"GPA index is missing {student_id}")
+            elif entry[0] != (-student.gpa(), student_id):
+                problems.append(f"GPA index has {student_id} at {-entry[0][0]}, actual GPA is {student.gpa()}")
+            elif entry[1] != expected_names:
+                problems.append(f"GPA index has {student_id} in the wrong department or level")
+
+        if self.history is not None:
+            indexed = _series_count(self.history, "student", student_id)
+            actual = _attendance_records(student)
+            if indexed != actual:
+                problems.append(f"History has {indexed} attendance records for {student_id}, student has {actual}")
+            indexed = _series_count(self.history, "student", student_id, "grade")
+            if indexed != len(student.grade_history):
+                problems.append(f"History has {indexed} grades for {student_id}, "
+                                f"student has {len(student.grade_history)}")
+        return problems
+
+    def check_course(self, course_code, registered=None):
+        """registered is an optional {student_id: set of codes} computed by check_all."""
+        problems = []
+        college = self.college
+        course = college.courses.get(course_code)
+        if course is None:
+            return problems
+
+        for student_id in course.enrolled_students:
+            student = college.students.get(student_id)
+            if student is None:
+                problems.append(f"{course_code} lists unknown student {student_id}")
+                continue
+            codes = registered[student_id] if registered is not None else \
+                {_code(c) for c in student.courses_reg}
+            if course_code not in codes:
+                problems.append(f"{course_code} lists {student_id} but {course_code} is not in their courses_reg")
+
+        professor_id = _professor_id(course.professor)
+        if professor_id is not None:
+            professor = college.professors.get(professor_id)
+            if professor is None:
+                problems.append(f"{course_code} is taught by unknown professor {professor_id}")
+            elif course_code not in professor.courses:
+                problems.append(f"{course_code} is taught by {professor_id} but is not in their courses")
+        return problems
+
+    def check_professor(self, professor_id):
+        problems = []
+        professor = self.college.professors.get(professor_id)
+        if professor is None:
+            return problems
+        if len(professor.courses) != len(set(professor.courses)):
+            problems.append(f"{professor_id} has a course twice: {professor.courses}")
+        for code in professor.courses:
+            course = self.college.courses.get(code)
+            if course is None:
+                problems.append(f"{professor_id} teaches unknown course {code}")
+            elif _professor_id(course.professor) != professor_id:
+                problems.append(f"{professor_id} has {code} but it is taught by {_professor_id(course.professor)}")
+        return problems
+
+    def check_department(self, name):
+        problems = []
+        department = self.college.departments.get(name)
+        if department is None:
+            return problems
+        if len(department.courses) != len(set(department.courses)):
+            problems.append(f"Department {name} has a course twice: {department.courses}")
+        for code in department.courses:
+            if code not in self.college.courses:
+                problems.append(f"Department {name} lists unknown course {code}")
+        return problems
+
+    def check_mutation(self, student_ids=(), course_codes=(), professor_ids=(), departments=()):
+        """Check only the records a mutation touched."""
+        problems = []
+        for student_id in student_ids:
+            problems.extend(self.check_student(student_id))
+        for course_code in course_codes:
+            problems.extend(self.check_course(course_code))
+        for professor_id in professor_ids:
+            problems.extend(self.check_professor(professor_id))
+        for name in departments:
+            problems.extend(self.check_department(name))
+        return problems
+
+    def check_all(self):
+        """Check the whole college, in time linear in its size."""
+        college = self.college
+        problems = []
+        registered = {}
+        for student_id, student in college.students.items():
+            registered[student_id] = {_code(c) for c in student.courses_reg}
+            problems.extend(self.check_student(student_id))
+        for course_code in college.courses:
+            problems.extend(self.check_course(course_code, registered))
+        for professor_id in college.professors:
+            problems.extend(self.check_professor(professor_id))
+        for name in college.departments:
+            problems.extend(self.check_department(name))
+
+        if self.gpa_index is not None:
+            for student_id in self.gpa_index.entries:
+                if student_id not in college.students:
+                    problems.append(f"GPA index still has removed student {student_id}")
+        if self.history is not None:
+            indexed = _series_count(self.history, "college", None)
+            actual = sum(_attendance_records(s) for s in college.students.values())
+            if indexed != actual:
+                problems.append(f"History has {indexed} attendance records, the college has {actual}")
+        return problems
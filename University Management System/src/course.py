@@ -7,8 +7,24 @@ class Course:
         self.level = level
         self.enrolled_students = {}
         self.professor = None
+        self.version = 0  # bumped on every committed write
 
     
+    @property
+    def course_id(self):
+        # Student and Grading refer to courses by course_id
+        return self.course_code
+
+    def add_student(self, student_id, name, level, department):
+        self.enrolled_students[student_id] = {
+            "name": name,
+            "level": level,
+            "department": department
+        }
+
+    def remove_student(self, student_id):
+        self.enrolled_students.pop(student_id, None)
+
     def assign_professor(self, professor_id):
         self.professor = professor_id
         print(f"Professor {professor_id} assigned to course {self.course_code}")
@@ -27,12 +43,17 @@ class Course:
             "credits": self.credits,
             "level": self.level,
             "enrolled_students": self.enrolled_students,
-            "professor": self.professor
+            "professor": self.professor,
+            "version": self.version
         }
     def from_dict(data):
-        return Course(
+        course = Course(
             course_code=data["course_code"],
             course_name=data["course_name"],
             credits=data["credits"],
             level=data["level"]
-        )
\ No newline at end of file
+        )
+        course.enrolled_students = data.get("enrolled_students", {})
+        course.professor = data.get("professor")
+        course.version = data.get("version", 0)
+        return course
\ No newline at end of file
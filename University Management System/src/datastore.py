@@ -0,0 +1,122 @@
+# datastore.py
+# Cached loading of the JSON data file.
+#
+# Parsing college_data.json is the slowest part of starting the program
+# once the data grows, and main.py used to parse it again for every menu
+# choice. load_data() keeps the parsed data in memory for the life of the
+# process, and in a marshal file next to the data file between runs
+# (marshal is the fastest loader for plain dicts/lists/strings). The cache
+# is trusted while the file's size and mtime are unchanged, and falls
+# back to comparing a SHA-1 of the contents when they are not (or when
+# the file was modified too close to the cache write to trust mtime).
+import hashlib
+import json
+import gc
+import marshal
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from concurrency import write_file
+
+# A file modified less than this long before the cache was written could
+# still change within the same mtime tick, so its hash is always checked
+RACY_WINDOW_NS = 1_000_000_000
+
+# In-process copy of the cache entry, {filename: cache}
+_memory_cache = {}
+
+
+def cache_filename(filename):
+    return filename + ".cache"
+
+
+@contextmanager
+def _gc_paused():
+    # Loading creates one container per record, which keeps triggering the
+    # cyclic GC for nothing; pausing it roughly halves the load time.
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _read_cache(filename):
+    try:
+        with open(cache_filename(filename), 'rb') as file, _gc_paused():
+            cache = marshal.loads(file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    # marshal's format is tied to the Python version that wrote it
+    if not isinstance(cache, dict) or cache.get("python") != sys.version_info[:2]:
+        return None
+    return cache
+
+
+def _write_cache(filename, stat, sha1, data):
+    cache = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha1": sha1,
+        "cached_at_ns": time.time_ns(),
+        "python": sys.version_info[:2],
+        "data": data,
+    }
+    # Per-process temp name, like concurrency._write: two programs starting
+    # together must not truncate or rename each other's half-written cache
+    tmp_name = f"{cache_filename(filename)}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_name, 'wb') as file:
+            file.write(marshal.dumps(cache))
+        os.replace(tmp_name, cache_filename(filename))
+    except OSError:
+        # The cache is only an optimization, a read-only folder is fine
+        pass
+    return cache
+
+
+def _stat_matches(cache, stat):
+    return (
+        cache["size"] == stat.st_size
+        and cache["mtime_ns"] == stat.st_mtime_ns
+        and cache["cached_at_ns"] - stat.st_mtime_ns > RACY_WINDOW_NS
+    )
+
+
+def load_data(filename):
+    """
+    Return the parsed contents of filename.
+    The same object is returned until the file changes, so callers that
+    want to modify it should work on a copy.
+    """
+    stat = os.stat(filename)
+    cache = _memory_cache.get(filename) or _read_cache(filename)
+    if cache is not None and _stat_matches(cache, stat):
+        _memory_cache[filename] = cache
+        return cache["data"]
+
+    with open(filename, 'rb') as file:
+        raw = file.read()
+    sha1 = hashlib.sha1(raw).hexdigest()
+    if cache is not None and cache["sha1"] == sha1:
+        data = cache["data"]
+    else:
+        with _gc_paused():
+            data = json.loads(raw)
+    # Refresh the stat/timestamp fields so the next start can skip the hash
+    _memory_cache[filename] = _write_cache(filename, stat, sha1, data)
+    return data
+
+
+def save_data(filename, data, cls=None):
+    """
+    Write data to filename atomically and invalidate the cached copy.
+    Goes through concurrency.write_file, so it waits for any record write
+    in progress instead of racing it.
+    """
+    write_file(filename, data, cls)
+    _memory_cache.pop(filename, None)
@@ -0,0 +1,468 @@
+# fuzz_model.py
+# Randomized consistency fuzzer for the data model.
+#
+# Builds a random College, saves it to a temporary data file, then
+# applies a long random sequence of registrations, drops, grades,
+# attendance marks, professor assignments and department changes through
+# the same code the CLI uses, with the GPA index and attendance history
+# attached. Some registrations, drops and attendance marks go straight
+# to the file instead (registration.py, Attendance.mark_attendance), some
+# of them on a student loaded from the file with Student.from_dict as the
+# menus in main.py do, and some attendance marks and grades are written
+# by "another program" the college in memory never hears of, so the
+# CLI's commits also have to survive version conflicts: attendance from
+# both sides must be kept, a grade that lost the race must be taken back.
+# Every few operations the changes are committed and the file is loaded
+# back into a second College, which must be consistent, hold the same
+# records, and give the same GPA index and history as the ones in memory.
+# ConsistencyChecker checks the touched records after every operation and
+# the whole college every few hundred. When something breaks, the
+# sequence is shrunk (delta debugging) to the smallest one that still
+# breaks, and printed.
+#
+# Usage: python fuzz_model.py [--runs N] [--ops N] [--seed N]
+import argparse
+import io
+import math
+import os
+import random
+import sys
+import tempfile
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+
+import registration
+from main import load_student
+from attendance import Attendance
+from cli import CommandError, CommandRunner
+from college import College
+from concurrency import read_record, update_many_with_retry, update_with_retry
+from consistency import ConsistencyChecker
+from course import Course
+from datastore import load_data, save_data
+from department import Department
+from gpa_index import GPAIndex
+from professor import Professor
+from student_system import Student
+from timeseries import TimeSeriesStore
+
+DEPARTMENTS = ["Computer Science", "Physics", "Mathematics"]
+GRADES = ["0", "1.0", "2.0", "2.7", "3.0", "3.3", "3.7", "4.0"]
+FULL_CHECK_EVERY = 250
+
+
+class FuzzFailure(Exception):
+    """An operation itself saw the model go wrong."""
+
+
+def make_college(seed, n_students=40, n_courses=15, n_professors=6):
+    rng = random.Random(seed)
+    college = College("Fuzz University")
+    for name in DEPARTMENTS:
+        college.departments[name] = Department(name)
+    for i in range(n_courses):
+        course = Course(f"C{i:03d}", f"Course {i}", 3, rng.randint(1, 4))
+        college.courses[course.course_code] = course
+        college.departments[rng.choice(DEPARTMENTS)].add_course(course.course_code)
+    for i in range(n_professors):
+        professor = Professor(f"Professor {i}", f"P{i:03d}", rng.choice(DEPARTMENTS))
+        college.professors[professor.professor_id] = professor
+    for i in range(n_students):
+        student = Student(f"Student {i}", f"S{i:03d}", rng.randint(1, 4), rng.choice(DEPARTMENTS))
+        college.students[student.student_id] = student
+    with redirect_stdout(io.StringIO()):
+        for code in college.courses:
+            if rng.random() < 0.7:
+                college.assign_professor(code, rng.choice(list(college.professors)))
+    return college
+
+
+def save_college(college, filename):
+    """Write college in the format main.py uses."""
+    save_data(filename, {
+        "college": {"name": college.name},
+        "students": [student.to_dict() for student in college.students.values()],
+        "professors": [professor.to_dict() for professor in college.professors.values()],
+        "departments": [department.to_dict() for department in college.departments.values()],
+        "courses": [course.to_dict() for course in college.courses.values()],
+    })
+
+
+class _Outside:
+    """What was written to the data file behind the runner's back."""
+
+    def __init__(self):
+        self.attendance = []  # [(student_id, course_code, entry)]
+        self.grades = []  # [(student_id, course_code, grade_history entry)]
+
+    def last_grades(self):
+        """{(student_id, course_code): the grade written last}"""
+        return {(student_id, code): entry['grade'] for student_id, code, entry in self.grades}
+
+
+@contextmanager
+def _session(seed):
+    """(runner, outside) for a fresh college built from seed and saved to a temporary file."""
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, "fuzz_data.json")
+        college = make_college(seed)
+        save_college(college, filename)
+        yield CommandRunner(filename, out=io.StringIO(), college=college), _Outside()
+
+
+def random_operation(college, rng):
+    """A random operation, mostly valid for the current state of college."""
+    student = rng.choice(list(college.students.values()))
+    registered = [c.course_code for c in student.courses_reg]
+    any_course = rng.choice(list(college.courses))
+    own_course = rng.choice(registered) if registered and rng.random() < 0.9 else any_course
+    status = "present" if rng.random() < 0.8 else "absent"
+    kind = rng.random()
+    if kind < 0.25:
+        return ("register", student.student_id, any_course)
+    if kind < 0.28:
+        return ("file-register", student.student_id, any_course)
+    if kind < 0.3:
+        return ("loaded-register", student.student_id, any_course)
+    if kind < 0.37:
+        return ("drop", student.student_id, own_course)
+    if kind < 0.385:
+        return ("file-drop", student.student_id, own_course)
+    if kind < 0.4:
+        return ("loaded-drop", student.student_id, own_course)
+    if kind < 0.58:
+        return ("grade", student.student_id, own_course, rng.choice(GRADES))
+    if kind < 0.8:
+        day = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        return ("mark-attendance", student.student_id, own_course, status, "--date", day)
+    if kind < 0.84:
+        return ("file-attendance", student.student_id, own_course, status)
+    if kind < 0.85:
+        day = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        return ("outside-attendance", student.student_id, own_course, status, day)
+    if kind < 0.86:
+        day = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        return ("outside-grade", student.student_id, own_course, rng.choice(GRADES), day)
+    if kind < 0.9:
+        return ("commit",)
+    if kind < 0.97:
+        return ("assign-professor", any_course, rng.choice(list(college.professors)))
+    return ("add-department-course", rng.choice(DEPARTMENTS), any_course)
+
+
+def _snapshot(college, outside=None):
+    """
+    What the CLI's commits persist for each student and course, order
+    aside, with the history written from outside added in. Grades are
+    left out, see _grade_problems().
+    """
+    marks, graded = {}, {}
+    if outside is not None:
+        for student_id, code, entry in outside.attendance:
+            marks.setdefault(student_id, []).append((code, entry['date'], entry['present']))
+        for student_id, code, entry in outside.grades:
+            graded.setdefault(student_id, []).append((code, entry['date'], entry['grade']))
+    students = {
+        student_id: (
+            sorted(student.course_codes()),
+            sorted(marks.get(student_id, []) +
+                   [(code, entry['date'], entry['present'])
+                    for code, entries in student.attendance.items() for entry in entries]),
+            sorted(graded.get(student_id, []) +
+                   [(entry['course'], entry['date'], entry['grade']) for entry in student.grade_history]),
+        )
+        for student_id, student in college.students.items()
+    }
+    courses = {code: sorted(course.enrolled_students) for code, course in college.courses.items()}
+    return students, courses
+
+
+def _grade_problems(college, loaded, outside):
+    # A grade written from outside stays on disk until the runner's own
+    # grade for that course replaces it, so either value is right
+    from_outside = outside.last_grades()
+    problems = []
+    for student_id, student in college.students.items():
+        saved = loaded.students[student_id].grades
+        if set(saved) != set(student.grades):
+            problems.append(f"{student_id} has grades for {sorted(saved)} in the data file, "
+                            f"{sorted(student.grades)} in memory")
+            continue
+        for code, grade in saved.items():
+            if grade != student.grades[code] and grade != from_outside.get((student_id, code)):
+                problems.append(f"{student_id} has grade {grade} for {code} in the data file, "
+                                f"{student.grades[code]} in memory")
+    return problems
+
+
+def _series_table(history):
+    return {name: [(bucket, round(total, 6), count) for bucket, total, count in series.range()]
+            for name, series in history.series.items() if series.buckets}
+
+
+def _derived_problems(runner, loaded, outside, index, history):
+    """Compare the index and history in memory with ones rebuilt from the data file."""
+    problems = []
+    rebuilt = TimeSeriesStore.build(loaded, attach=False)
+    # The runner never heard of the outside writes, take them back out
+    for student_id, code, entry in outside.attendance:
+        rebuilt.retract_attendance(loaded.students[student_id], code, entry['date'], entry['present'])
+    for student_id, code, entry in outside.grades:
+        rebuilt.retract_grade(loaded.students[student_id], code, entry['grade'], entry['date'])
+    expected, actual = _series_table(rebuilt), _series_table(history)
+    for name in sorted(set(expected) | set(actual), key=repr):
+        if expected.get(name) != actual.get(name):
+            problems.append(f"History {name} is {actual.get(name)} in memory, "
+                            f"{expected.get(name)} from the data file")
+
+    rebuilt_index = GPAIndex.build(loaded, attach=False)
+    graded_outside = {student_id for student_id, _, _ in outside.grades}
+    for student_id in runner.college.students:
+        if student_id in graded_outside:
+            continue
+        gpa, saved_gpa = index.gpa(student_id), rebuilt_index.gpa(student_id)
+        if gpa is None or saved_gpa is None or not math.isclose(gpa, saved_gpa):
+            problems.append(f"GPA index has {gpa} for {student_id}, the data file gives {saved_gpa}")
+    return problems
+
+
+def check_round_trip(runner, outside, index=None, history=None):
+    """
+    Commit, load the file back and compare it with the college in memory
+    plus what was written from outside, and the index and history with
+    ones rebuilt from the file.
+    """
+    runner.commit()
+    loaded = College.from_data(load_data(runner.filename))
+    problems = ["After reload: " + problem for problem in ConsistencyChecker(loaded).check_all()]
+    students, courses = _snapshot(runner.college, outside)
+    loaded_students, loaded_courses = _snapshot(loaded)
+    for student_id, state in students.items():
+        if loaded_students.get(student_id) != state:
+            problems.append(f"{student_id} in the data file differs from memory: "
+                            f"{loaded_students.get(student_id)} != {state}")
+    problems.extend(_grade_problems(runner.college, loaded, outside))
+    for code, enrolled in courses.items():
+        if loaded_courses.get(code) != enrolled:
+            problems.append(f"{code} enrolled_students in the data file differs from memory: "
+                            f"{loaded_courses.get(code)} != {enrolled}")
+    if index is not None and history is not None:
+        problems.extend(_derived_problems(runner, loaded, outside, index, history))
+    return problems
+
+
+def _save_assignment(runner, course_code, professor_ids):
+    """The CLI has no assign-professor command, write the course and professors directly."""
+    college = runner.college
+    entities = [college.courses[course_code]] + [college.professors[p] for p in professor_ids]
+    keys = [("courses", course_code)] + [("professors", p) for p in professor_ids]
+
+    def mutate(records):
+        records[0]['professor'] = entities[0].professor
+        for record, professor in zip(records[1:], entities[1:]):
+            record['courses'] = list(professor.courses)
+        return records
+
+    records, base_versions = update_many_with_retry(runner.filename, keys, mutate)
+    for entity, record, base in zip(entities, records, base_versions):
+        if base == entity.version:
+            entity.version = record['version']
+
+
+def _write_from_outside(runner, outside, op):
+    """Another program marks attendance or gives a grade, straight in the file."""
+    _, student_id, course_code, value, day = op
+    if op[0] == "outside-attendance":
+        entry = {'date': day, 'present': value == "present"}
+
+        def append_entry(record):
+            record.setdefault('attendance', {}).setdefault(course_code, []).append(entry)
+            return record
+
+        update_with_retry(runner.filename, 'students', student_id, append_entry)
+        outside.attendance.append((student_id, course_code, entry))
+        return
+
+    entry = {'course': course_code, 'grade': float(value), 'date': day}
+    given = []
+
+    def give_grade(record):
+        given.clear()
+        if course_code in record.get('courses_reg', []):
+            record.setdefault('grades', {})[course_code] = entry['grade']
+            record.setdefault('grade_history', []).append(entry)
+            given.append(entry)
+        return record
+
+    update_with_retry(runner.filename, 'students', student_id, give_grade)
+    if given:
+        outside.grades.append((student_id, course_code, entry))
+
+
+def _apply_to_loaded_student(runner, op):
+    """Register or drop on a fresh Student.from_dict copy, like the menus in main.py."""
+    runner.commit()
+    college = runner.college
+    course = college.courses[op[2]]
+    loaded = load_student(runner.filename, op[1])
+    if op[0] == "loaded-register":
+        registration.register_course(runner.filename, loaded, course)
+    else:
+        registration.drop_course(runner.filename, loaded, course)
+    saved, _ = read_record(runner.filename, 'students', op[1])
+    if sorted(loaded.course_codes()) != sorted(saved['courses_reg']):
+        raise FuzzFailure(f"{' '.join(op)}: the loaded student has {sorted(loaded.course_codes())}, "
+                          f"the data file has {sorted(saved['courses_reg'])}")
+
+    # The runner's copy of the student learns about it the way it would
+    # from another program: in memory, without taking the new version
+    student = college.students[op[1]]
+    registered = op[2] in student.course_codes()
+    if op[2] in saved['courses_reg'] and not registered:
+        student.register_course(course)
+    elif op[2] not in saved['courses_reg'] and registered:
+        student.drop_course(course)
+
+
+def apply_operation(runner, op, outside):
+    """Apply op, returns what it touched as check_mutation() keyword arguments."""
+    college = runner.college
+    if op[0] == "commit":
+        return {}
+    if op[0].startswith("outside-"):
+        _write_from_outside(runner, outside, op)
+        return {}
+    if op[0] == "assign-professor":
+        course = college.courses[op[1]]
+        previous = getattr(course.professor, "professor_id", course.professor)
+        college.assign_professor(op[1], op[2])
+        professor_ids = [p for p in dict.fromkeys((previous, op[2])) if p]
+        _save_assignment(runner, op[1], professor_ids)
+        return {"course_codes": [op[1]], "professor_ids": professor_ids}
+    if op[0] == "add-department-course":
+        college.departments[op[1]].add_course(op[2])
+        return {"departments": [op[1]]}
+    if op[0].startswith("loaded-"):
+        _apply_to_loaded_student(runner, op)
+        return {"student_ids": [op[1]], "course_codes": [op[2]]}
+    student, course = college.students[op[1]], college.courses[op[2]]
+    if op[0].startswith("file-"):
+        # These change the same objects the runner holds, so its pending
+        # changes have to reach the file first, as they would in main.py
+        runner.commit()
+    if op[0] == "file-register":
+        registration.register_course(runner.filename, student, course)
+    elif op[0] == "file-drop":
+        registration.drop_course(runner.filename, student, course)
+    elif op[0] == "file-attendance":
+        Attendance().mark_attendance(student, course.course_code, op[3] == "present", runner.filename)
+    if op[0].startswith("file-"):
+        return {"student_ids": [op[1]], "course_codes": [op[2]]}
+    try:
+        runner.execute(list(op))
+    except CommandError:
+        pass  # rejected commands are expected, they must just not break anything
+    return {"student_ids": [op[1]], "course_codes": [op[2]]}
+
+
+def replay(seed, ops, stop_early=True):
+    """
+    Run ops against a fresh college built from seed.
+    Returns (index of the failing op, problems), or None if all is well.
+    """
+    with _session(seed) as (runner, outside), redirect_stdout(io.StringIO()), \
+            redirect_stderr(io.StringIO()):
+        college = runner.college
+        index = GPAIndex.build(college)
+        history = TimeSeriesStore.build(college)
+        checker = ConsistencyChecker(college, index, history)
+        for i, op in enumerate(ops):
+            try:
+                touched = apply_operation(runner, op, outside)
+            except FuzzFailure as failure:
+                problems = [str(failure)]
+            else:
+                if op[0] == "commit":
+                    problems = check_round_trip(runner, outside, index, history)
+                else:
+                    problems = checker.check_mutation(**touched)
+            if not problems and (i + 1) % FULL_CHECK_EVERY == 0:
+                problems = checker.check_all()
+            if problems and stop_early:
+                return i, problems
+        problems = checker.check_all() or check_round_trip(runner, outside, index, history)
+        if problems:
+            return len(ops) - 1, problems
+    return None
+
+
+def generate(seed, n_ops):
+    """Generate n_ops operations, each one picked against the state the previous ones left."""
+    rng = random.Random(seed)
+    ops = []
+    with _session(seed) as (runner, outside), redirect_stdout(io.StringIO()), \
+            redirect_stderr(io.StringIO()):
+        for _ in range(n_ops):
+            op = random_operation(runner.college, rng)
+            ops.append(op)
+            try:
+                apply_operation(runner, op, outside)
+            except FuzzFailure:
+                pass  # replay() reports it
+            if op[0] == "commit":
+                runner.commit()
+    return ops
+
+
+def shrink(seed, ops):
+    """Delta debugging: drop chunks of ops for as long as the replay still fails."""
+    def fails(candidate):
+        return replay(seed, candidate) is not None
+
+    chunks = 2
+    while len(ops) >= 2:
+        size = -(-len(ops) // chunks)
+        for start in range(0, len(ops), size):
+            candidate = ops[:start] + ops[start + size:]
+            if fails(candidate):
+                ops = candidate
+                chunks = max(chunks - 1, 2)
+                break
+        else:
+            if chunks >= len(ops):
+                break
+            chunks = min(len(ops), chunks * 2)
+    return ops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz the data model for consistency bugs")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--ops", type=int, default=2000, help="operations per run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for run in range(args.runs):
+        seed = args.seed + run
+        ops = generate(seed, args.ops)
+        failure = replay(seed, ops)
+        if failure is None:
+            continue
+
+        failed_at, problems = failure
+        print(f"Seed {seed}: inconsistency after operation {failed_at + 1} of {len(ops)}")
+        minimal = shrink(seed, ops[:failed_at + 1])
+        _, problems = replay(seed, minimal)
+        print(f"Minimal failing sequence ({len(minimal)} operations, seed {seed}):")
+        for op in minimal:
+            print("  " + " ".join(op))
+        print("Problems:")
+        for problem in problems:
+            print("  " + problem)
+        return 1
+
+    print(f"{args.runs} runs of {args.ops} operations, no inconsistencies found.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+# gpa_index.py
+# Order-statistics index on student GPA, for dean's lists, class rank
+# and probation lists.
+#
+# Students are kept sorted by GPA in an indexable skip list (every link
+# also stores how many students it jumps over), so rank, percentile and
+# the start of a top-N list are found in O(log n) instead of computing
+# and sorting every GPA. There is one list for the whole college, one per
+# department and one per (department, level). Once attached, the index
+# is told about every grade change, so it never has to be rebuilt.
+import math
+import random
+
+# Enough levels for millions of students with p = 1/2
+MAX_LEVEL = 24
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, height):
+        self.key = key
+        self.next = [None] * height
+        # width[i] = how many positions next[i] is ahead of this node
+        self.width = [1] * height
+
+
+class RankedSkipList:
+    """Sorted list with O(log n) insert, remove, rank and lookup by position."""
+
+    def __init__(self):
+        self.head = _Node(None, MAX_LEVEL)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _predecessors(self, key):
+        """Last node before key on every level, and its position."""
+        chain = [None] * MAX_LEVEL
+        positions = [0] * MAX_LEVEL
+        node = self.head
+        pos = 0
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                pos += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            positions[level] = pos
+        return chain, positions
+
+    def insert(self, key):
+        chain, positions = self._predecessors(key)
+        height = 1
+        while height < MAX_LEVEL and random.random() < 0.5:
+            height += 1
+
+        new_node = _Node(key, height)
+        new_pos = positions[0] + 1
+        for level in range(height):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            # everything after the new node moved one position to the right
+            new_node.width[level] = prev.width[level] - (new_pos - positions[level]) + 1
+            prev.width[level] = new_pos - positions[level]
+        for level in range(height, MAX_LEVEL):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key):
+        chain, _ = self._predecessors(key)
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for level in range(MAX_LEVEL):
+            prev = chain[level]
+            if prev.next[level] is target:
+                prev.width[level] += target.width[level] - 1
+                prev.next[level] = target.next[level]
+            else:
+                prev.width[level] -= 1
+        self.size -= 1
+
+    def rank(self, key):
+        """Number of keys smaller than key."""
+        return self._predecessors(key)[1][0]
+
+    def _node_at(self, index):
+        node = self.head
+        pos = 0
+        target = index + 1
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and pos + node.width[level] <= target:
+                pos += node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return self._node_at(index).key
+
+    def items_from(self, index, count=None):
+        """Keys from position index onwards, at most count of them."""
+        if index >= self.size:
+            return []
+        node = self._node_at(index)
+        keys = []
+        while node is not None and (count is None or len(keys) < count):
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+def _after_gpa(gpa):
+    # Keys are (-gpa, student_id), so this sorts after every key with this
+    # GPA and before every key with a lower one
+    return (math.nextafter(-gpa, math.inf),)
+
+
+class GPAIndex:
+    def __init__(self):
+        self.partitions = {}  # {None | department | (department, level): RankedSkipList}
+        self.entries = {}  # {student_id: (key, partition names)}
+        self.college = None
+
+    @classmethod
+    def build(cls, college, attach=True):
+        index = cls()
+        index.college = college
+        for student in college.students.values():
+            index.update_student(student)
+        if attach:
+            index.attach()
+        return index
+
+    def attach(self):
+        """Keep the index up to date with every grade change in its college from now on."""
+        self.college.attach_listeners(grade=self.update_student, student_removed=self._on_student_removed)
+
+    def detach(self):
+        self.college.detach_listeners(grade=self.update_student, student_removed=self._on_student_removed)
+
+    def _on_student_removed(self, student):
+        self.remove_student(student.student_id)
+
+    def update_student(self, student, course_id=None):
+        self.remove_student(student.student_id)
+        key = (-student.gpa(), student.student_id)
+        names = (None, student.department, (student.department, student.level))
+        for name in names:
+            self.partitions.setdefault(name, RankedSkipList()).insert(key)
+        self.entries[student.student_id] = (key, names)
+
+    def remove_student(self, student_id):
+        entry = self.entries.pop(student_id, None)
+        if entry is None:
+            return False
+        key, names = entry
+        for name in names:
+            self.partitions[name].remove(key)
+        return True
+
+    def _partition(self, department, level):
+        if department is None:
+            name = None
+        elif level is None:
+            name = department
+        else:
+            name = (department, level)
+        return self.partitions.get(name, RankedSkipList())
+
+    def gpa(self, student_id):
+        entry = self.entries.get(student_id)
+        return None if entry is None else -entry[0][0]
+
+    def rank(self, student_id, department=None, level=None):
+        """1-based rank by GPA (students with equal GPA share a rank), None if not indexed."""
+        gpa = self.gpa(student_id)
+        if gpa is None:
+            return None
+        return self._partition(department, level).rank((-gpa,)) + 1
+
+    def percentile(self, student_id, department=None, level=None):
+        """Percentage of students in the partition with a lower GPA."""
+        gpa = self.gpa(student_id)
+        if gpa is None:
+            return None
+        partition = self._partition(department, level)
+        if not partition:
+            return None
+        lower = len(partition) - partition.rank(_after_gpa(gpa))
+        return 100.0 * lower / len(partition)
+
+    def top(self, n, department=None, level=None):
+        """[(student_id, gpa)] for the n best GPAs, highest first."""
+        keys = self._partition(department, level).items_from(0, n)
+        return [(student_id, -neg_gpa) for neg_gpa, student_id in keys]
+
+    def below(self, gpa, department=None, level=None):
+        """[(student_id, gpa)] for everyone with a GPA under gpa, e.g. for probation."""
+        partition = self._partition(department, level)
+        keys = partition.items_from(partition.rank(_after_gpa(gpa)))
+        return [(student_id, -neg_gpa) for neg_gpa, student_id in keys]
@@ -1,15 +1,40 @@
 # grading_system.py
+from datetime import date
 from student_system import Student
 from course import Course
+from concurrency import read_record, compare_and_swap, VersionConflict
 class Grading:
     def assign_grade(student, course, grade):
         if course.course_id in student.grades:
-            student.grades[course.course_id] = grade
+            student.set_grade(course.course_id, grade)
             print(f"Grade {grade} assigned to {student.name}")
             return True
         print(f"Student not registered for {course.course_name}")
         return False
-    
+
+    def commit_grade(student, course_id, grade, filename):
+        # Overwriting a grade does not commute, so there is no automatic
+        # retry: if someone else changed this student since we loaded it,
+        # the professor has to reload and look at the newer record first.
+        record, version = read_record(filename, 'students', student.student_id)
+        if record is None:
+            print(f"Student with ID {student.student_id} not found.")
+            return False
+        if version != student.version:
+            print(f"{student.name} was changed by someone else, reload and try again.")
+            return False
+        day = date.today().isoformat()
+        record.setdefault('grades', {})[course_id] = grade
+        record.setdefault('grade_history', []).append({'course': course_id, 'grade': grade, 'date': day})
+        try:
+            student.version = compare_and_swap(filename, 'students', student.student_id, version, record)
+        except VersionConflict:
+            print(f"{student.name} was changed by someone else, reload and try again.")
+            return False
+        student.set_grade(course_id, grade, day)
+        print(f"Grade {grade} saved for {student.name}")
+        return True
+
     def view_student_grades(student):
         if not student.grades:
             print("No grades available")
@@ -1,13 +1,11 @@
 import json
-from college import College
-from student_system import Student
-from course import Course
-from department import Department
-from registration import register_student, register_course, drop_course
-from attendance import Attendance
-from grading_system import Grading
-from professor import Professor
+import os
+import sys
 import config
+from datastore import load_data, save_data
+
+# The subsystems are imported inside the functions that use them, so a
+# run that only needs one menu (or a batch job) does not pay for all of them
 
 class CustomEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -16,6 +14,12 @@ class CustomEncoder(json.JSONEncoder):
         return super().default(obj)
 
 def initialize_data():
+    from college import College
+    from student_system import Student
+    from course import Course
+    from department import Department
+    from professor import Professor
+
     # Create a college
     college = College("Tech University")
     
@@ -52,6 +56,8 @@ def initialize_data():
     # Assign professors to courses
     course1.assign_professor(professor1)
     course2.assign_professor(professor2)
+    professor1.add_course(course1.course_code)
+    professor2.add_course(course2.course_code)
     
     # Serialize data
     data = {
@@ -78,6 +84,8 @@ def display_menu():
 
 
 def student_menu(student, filename):
+    from registration import register_student, drop_course
+
     while True:
         print("\n====== Student Menu ======")
         print("1. View My Information")
@@ -105,7 +113,21 @@ def student_menu(student, filename):
         else:
             print("Invalid choice. Please try again.")
 
+def load_student(filename, student_id):
+    """Read one student straight from the data file, with its version."""
+    from student_system import Student
+    from concurrency import read_record
+
+    record, _ = read_record(filename, 'students', student_id)
+    if record is None:
+        print(f"Student with ID {student_id} not found.")
+        return None
+    return Student.from_dict(record)
+
 def professor_menu(professor, filename):
+                from attendance import Attendance
+                from grading_system import Grading
+
                 while True:
                     print("\n====== Professor Menu ======")
                     print("1. View My Information")
@@ -126,14 +148,24 @@ def professor_menu(professor, filename):
                         course_id = input("Enter the Course ID to record attendance: ")
                         student_id = input("Enter the Student ID: ")
                         status = input("Enter Attendance Status (Present/Absent): ")
-                        Attendance.record_attendance(course_id, student_id, status, filename)
-                        print("Attendance recorded successfully.")
+                        student = load_student(filename, student_id)
+                        if student:
+                            Attendance().mark_attendance(student, course_id, status.strip().lower() == "present", filename)
                     elif choice == "4":
                         course_id = input("Enter the Course ID to assign grades: ")
                         student_id = input("Enter the Student ID: ")
-                        grade = input("Enter Grade: ")
-                        Grading.assign_grade(course_id, student_id, grade, filename)
-                        print("Grade assigned successfully.")
+                        try:
+                            grade = float(input("Enter Grade: "))
+                        except ValueError:
+                            print("Please enter a valid grade.")
+                            continue
+                        student = load_student(filename, student_id)
+                        if student is None:
+                            continue
+                        if course_id not in student.course_codes():
+                            print("Student not enrolled in this course!")
+                            continue
+                        Grading.commit_grade(student, course_id, grade, filename)
                     elif choice == "5":
                         print("Exiting Professor Menu...")
                         break
@@ -141,15 +173,20 @@ def professor_menu(professor, filename):
                         print("Invalid choice. Please try again.")
 
 def admin_menu(college):
+    from student_system import Student
+    from professor import Professor
+    from course import Course
+
     while True:
         print("\n====== Admin Menu ======")
         print("1. View College Information")
         print("2. Add Student")
         print("3. Add Professor")
         print("4. Add Course")
-        print("5. Exit")
+        print("5. View Write Contention")
+        print("6. Exit")
 
-        choice = input("Enter your choice (1-5): ")
+        choice = input("Enter your choice (1-6): ")
         if choice == "1":
             print("\n--- College Information ---")
             print(json.dumps(college.to_dict(), indent=4))
@@ -185,42 +222,53 @@ def admin_menu(college):
                 print(f"Department {department_name} not found.")
             print(f"Course {name} added successfully.")
         elif choice == "5":
+            from concurrency import print_contention_report
+            print_contention_report()
+        elif choice == "6":
             print("Exiting Admin Menu...")
             break
         else:
             print("Invalid choice. Please try again.")
 
+def fast_start(filename, reset=False):
+    """
+    Load the data file, only building the sample data when it does not
+    exist yet (or when reset is asked for explicitly).
+    """
+    if reset or not os.path.exists(filename):
+        save_data(filename, initialize_data(), cls=CustomEncoder)
+        print(f"Data saved to {filename}")
+    return load_data(filename)
+
 if __name__ == "__main__":
-    c = initialize_data()
-    with open("college_data.json", "w") as json_file:
-        json.dump(c, json_file, indent=4, cls=CustomEncoder)
-    print("Data saved to college_data.json")
+    filename = config.DATA_FILE
+    fast_start(filename, reset="--reset" in sys.argv)
     
     while True:
         choice = display_menu()
         if choice == "1":
+            from student_system import Student
             student_id = input("Enter your Student ID: ")
-            with open("college_data.json", "r") as json_file:
-                data = json.load(json_file)
+            data = load_data(filename)
             student_data = next((s for s in data["students"] if s["student_id"] == student_id), None)
             if student_data:
                 student = Student.from_dict(student_data)
-                student_menu(student, "college_data.json")
+                student_menu(student, filename)
             else:
                 print("Student not found.")
         elif choice == "2":
+            from professor import Professor
             professor_id = input("Enter your Professor ID: ")
-            with open("college_data.json", "r") as json_file:
-                data = json.load(json_file)
+            data = load_data(filename)
             professor_data = next((p for p in data["professors"] if p["professor_id"] == professor_id), None)
             if professor_data:
                 professor = Professor.from_dict(professor_data)
-                professor_menu(professor, "college_data.json")
+                professor_menu(professor, filename)
             else:
                 print("Professor not found.")
         elif choice == "3":
-            with open("college_data.json", "r") as json_file:
-                data = json.load(json_file)
+            from college import College
+            data = load_data(filename)
             college = College.from_dict(data["college"])
             admin_menu(college)
         elif choice == "0":
@@ -228,7 +276,3 @@ if __name__ == "__main__":
             break
         else:
             print("Invalid choice. Please try again.")
-    
-
-
-        
@@ -4,6 +4,7 @@ class  Professor:
         self.professor_id = professor_id
         self.department = department
         self.courses = []  # List of course IDs the professor teaches
+        self.version = 0  # bumped on every committed write
 
     def add_course(self, course_id):
         if course_id not in self.courses:
@@ -27,11 +28,15 @@ class  Professor:
             "name": self.name,
             "professor_id": self.professor_id,
             "department": self.department,
-            "courses": self.courses
+            "courses": self.courses,
+            "version": self.version
         }
     def from_dict(data):
-        return Professor(
+        professor = Professor(
             name=data["name"],
             professor_id=data["professor_id"],
             department=data["department"]
-        )
\ No newline at end of file
+        )
+        professor.courses = data.get("courses", [])
+        professor.version = data.get("version", 0)
+        return professor
\ No newline at end of file
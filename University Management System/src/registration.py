@@ -1,8 +1,9 @@
+import config
 from student_system import Student
 from course import Course
 from department import Department
 from college import College
-import json
+from concurrency import compare_and_swap, update_many_with_retry, VersionConflict
 def register_student(filename, college):
     """
     Function to register a new student.
@@ -12,61 +13,116 @@ def register_student(filename, college):
     level = int(input("Enter level: "))
     department = input("Enter department: ")
 
-    student = Student(student_id, name, level, department)
+    student = Student(name, student_id, level, department)
     college.add_student(student)
-    with open(filename, 'r') as file:
-        data = json.load(file)
-    if student_id in data['students']:
+    record = {
+        'student_id': student_id,
+        'name': name,
+        'level': level,
+        'department': department,
+        'courses_reg': [],
+        'grades': {},
+        'attendance': {}
+    }
+    try:
+        # expected version None: only insert if nobody created it meanwhile
+        student.version = compare_and_swap(filename, 'students', student_id, None, record)
+    except VersionConflict:
         print(f"Student with ID {student_id} already exists.")
         return
-    else:
-        data['students'][student_id] = {
-            'name': name,
-            'level': level,
-            'department': department
-        }
-    with open(filename, 'w') as file:
-        json.dump(data, file, indent=4)
 
     print(f"Student {name} registered successfully.")
     
+def _courses_reg(record):
+    # Files written by older versions of this module used a 'courses' key
+    courses = record.setdefault('courses_reg', [])
+    for code in record.pop('courses', []):
+        if code not in courses:
+            courses.append(code)
+    return courses
+
+def _save_registration(filename, student, course, mutate):
+    """
+    Write the student and course records together, retrying on a conflict
+    (registering and dropping only add to or remove from sets, so they
+    commute). Returns False if either record is missing from the file.
+    """
+    result = update_many_with_retry(
+        filename,
+        [('students', student.student_id), ('courses', course.course_code)],
+        mutate
+    )
+    if result is None:
+        return False
+    (student_record, course_record), (student_base, course_base) = result
+    # Only take the new versions if nobody else changed the records in
+    # between, otherwise the in-memory objects are stale and later strict
+    # writes (Grading.commit_grade) must notice that
+    if student_base == student.version:
+        student.version = student_record['version']
+    if course_base == course.version:
+        course.version = course_record['version']
+    return True
+
 def register_course(filename, student, course):
     """
     Function to register a course for a student.
     """
-    with open(filename, 'r') as file:
-        data = json.load(file) 
-    if student.student_id not in data['students']:
-        print(f"Student with ID {student.student_id} not found.")
-        return
-    if course.course_code in student.courses_reg:
+    if course.course_code in student.course_codes():
         print(f"Already registered for {course.course_name}.")
         return
-    if student.level < course.level:
+    if len(student.courses_reg) >= config.MAX_COURSES:
+        print(f"You can register for at most {config.MAX_COURSES} courses.")
+        return
+    try:
+        too_low = int(student.level) < int(course.level)
+    except ValueError:
+        print(f"Invalid level for {student.student_id} or {course.course_code}.")
+        return
+    if too_low:
         print(f"Course {course.course_name} is not available for your level.")
         return
+
+    def add_course(records):
+        student_record, course_record = records
+        courses = _courses_reg(student_record)
+        if course.course_code not in courses:
+            # Same as Student.register_course: the grade starts at 0 and
+            # the attendance of an earlier registration is kept
+            courses.append(course.course_code)
+            student_record.setdefault('grades', {})[course.course_code] = 0
+            student_record.setdefault('attendance', {}).setdefault(course.course_code, [])
+        course_record.setdefault('enrolled_students', {})[student.student_id] = {
+            'name': student.name,
+            'level': student.level,
+            'department': student.department
+        }
+        return records
+
+    if not _save_registration(filename, student, course, add_course):
+        print(f"Student {student.student_id} or course {course.course_code} not found.")
+        return
     student.register_course(course)
-    data['students'][student.student_id]['courses'].append(course.course_code)
-    with open(filename, 'w') as file:
-        json.dump(data, file, indent=4)
     print(f"Registered for {course.course_name} successfully.")
 
 def drop_course(filename, student, course):
     """
     Function to drop a course for a student.
     """
-    with open(filename, 'r') as file:
-        data = json.load(file)      
-    if student.student_id not in data['students']:
-        print(f"Student with ID {student.student_id} not found.")
-        return
-    if course.course_code not in student.courses_reg:
+    if course.course_code not in student.course_codes():
         print(f"Not registered for {course.course_name}.")
         return
-    student.drop_course(course)
-    data['students'][student.student_id]['courses'].remove(course.course_code)
-    with open(filename, 'w') as file:
-        json.dump(data, file, indent=4)
-    print(f"Dropped {course.course_name} successfully.")
 
+    def remove_course(records):
+        student_record, course_record = records
+        courses = _courses_reg(student_record)
+        if course.course_code in courses:
+            courses.remove(course.course_code)
+        course_record.setdefault('enrolled_students', {}).pop(student.student_id, None)
+        return records
 
+    if not _save_registration(filename, student, course, remove_course):
+        print(f"Student {student.student_id} or course {course.course_code} not found.")
+        return
+    student.drop_course(course)
+    print(f"Dropped {course.course_name} successfully.")
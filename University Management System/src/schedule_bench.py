@@ -0,0 +1,75 @@
+# schedule_bench.py
+# Solve-time benchmark for scheduler.py as the number of courses grows.
+# Builds random terms (students taking courses mostly from one cohort, professors
+# teaching a few each, rooms of mixed sizes) and reports the time of the
+# first greedy pass, how many sections were placed and whether the
+# result is conflict-free.
+#
+# Usage: python schedule_bench.py [--courses 100 500 1000] [--budget SECONDS]
+import argparse
+import math
+import random
+import time
+
+from course import Course
+from scheduler import Scheduler, default_time_slots
+
+COURSES_PER_STUDENT = 5
+COHORT_SIZE = 12
+COURSES_PER_PROFESSOR = 3
+AVERAGE_ENROLLMENT = 40
+ROOM_SIZES = [50, 60, 80, 120]
+
+
+def make_term(n_courses, seed):
+    rng = random.Random(seed)
+    courses = [Course(f"C{i:05d}", f"Course {i}", 3, rng.randint(1, 4)) for i in range(n_courses)]
+
+    # Students mostly take courses from their own department and level
+    # (a cohort), plus one elective from anywhere
+    cohorts = [courses[i:i + COHORT_SIZE] for i in range(0, n_courses, COHORT_SIZE)]
+    n_students = n_courses * AVERAGE_ENROLLMENT // COURSES_PER_STUDENT
+    for s in range(n_students):
+        cohort = rng.choice(cohorts)
+        taken = rng.sample(cohort, min(COURSES_PER_STUDENT - 1, len(cohort)))
+        elective = rng.choice(courses)
+        if elective not in taken:
+            taken.append(elective)
+        for course in taken:
+            course.add_student(f"S{s:07d}", "", 1, "")
+
+    for p, start in enumerate(range(0, n_courses, COURSES_PER_PROFESSOR)):
+        for course in courses[start:start + COURSES_PER_PROFESSOR]:
+            course.professor = f"P{p:05d}"
+
+    # Enough seats for every section with some slack
+    n_rooms = math.ceil(n_courses * 1.3 / len(default_time_slots()))
+    rooms = {f"R{r:04d}": ROOM_SIZES[r % len(ROOM_SIZES)] for r in range(n_rooms)}
+    return courses, rooms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduler solve-time benchmark")
+    parser.add_argument("--courses", type=int, nargs="+", default=[100, 250, 500, 1000, 2000])
+    parser.add_argument("--budget", type=float, default=2.0, help="restart time budget in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'courses':>8} {'sections':>9} {'edges':>8} {'build':>8} {'first':>8} {'solve':>8} "
+          f"{'restarts':>9} {'placed':>8} {'valid':>6}")
+    for n_courses in args.courses:
+        courses, rooms = make_term(n_courses, args.seed)
+        start = time.perf_counter()
+        scheduler = Scheduler(courses, rooms)
+        build_time = time.perf_counter() - start
+        timetable = scheduler.solve(args.budget, seed=args.seed)
+
+        edges = sum(len(n) for n in scheduler.neighbours.values()) // 2
+        placed = len(timetable.assignments) / len(scheduler.units)
+        valid = not scheduler.conflicts(timetable)
+        print(f"{n_courses:>8} {len(scheduler.units):>9} {edges:>8} {build_time:>7.2f}s "
+              f"{timetable.first_pass_time:>7.2f}s {timetable.solve_time:>7.2f}s {timetable.restarts:>9} {placed:>8.1%} {str(valid):>6}")
+
+
+if __name__ == "__main__":
+    main()
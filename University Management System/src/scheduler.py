@@ -0,0 +1,242 @@
+# scheduler.py
+# Builds a term timetable: every course section gets a time slot and a
+# room, such that
+#   - no professor teaches two sections at the same time,
+#   - no student has two of their courses at the same time,
+#   - sections of the same course are at different times,
+#   - a room holds one section per slot and is big enough for it.
+#
+# This is graph coloring (courses that share a student or professor are
+# neighbours and need different slots) with room capacities on top. The
+# first pass is a DSatur greedy: always place the section with the most
+# already-blocked slots next, in the slot whose smallest fitting room
+# wastes the fewest seats. Until the time budget runs out, randomized
+# restarts try to place whatever the previous best left unscheduled.
+import bisect
+import heapq
+import math
+import random
+import time
+
+import config
+
+
+def default_time_slots():
+    return [f"{day} {hour:02d}:00"
+            for day in config.SCHEDULE_DAYS
+            for hour in config.SCHEDULE_START_HOURS]
+
+
+def _professor_id(course):
+    professor = course.professor
+    # initialize_data() assigns Professor objects, the data file stores IDs
+    return getattr(professor, "professor_id", professor)
+
+
+class Timetable:
+    def __init__(self, time_slots):
+        self.time_slots = time_slots
+        self.assignments = {}  # {(course_code, section): (slot, room)}
+        self.unscheduled = []  # [(course_code, section)]
+        self.first_pass_time = 0.0
+        self.solve_time = 0.0
+        self.restarts = 0
+
+    def for_course(self, course_code):
+        return {section: placed for (code, section), placed in self.assignments.items()
+                if code == course_code}
+
+    def for_room(self, room):
+        return {placed[0]: key for key, placed in self.assignments.items() if placed[1] == room}
+
+    def print_timetable(self):
+        print("\n--- Timetable ---")
+        for (code, section), (slot, room) in sorted(self.assignments.items(),
+                                                     key=lambda item: item[1]):
+            print(f"{slot}  {room:<10} {code} section {section}")
+        if self.unscheduled:
+            print(f"Could not schedule: {', '.join(f'{c}/{s}' for c, s in self.unscheduled)}")
+
+    def to_dict(self):
+        return {
+            "assignments": [
+                {"course_code": code, "section": section, "slot": slot, "room": room}
+                for (code, section), (slot, room) in self.assignments.items()
+            ],
+            "unscheduled": [{"course_code": code, "section": section}
+                            for code, section in self.unscheduled],
+        }
+
+
+class Scheduler:
+    def __init__(self, courses, rooms, time_slots=None, students=None,
+                 expected_enrollment=None):
+        """
+        courses: list of Course
+        rooms: {room name: capacity}
+        students: list of Student, used for student conflicts when a
+            course's enrolled_students is empty (e.g. registrations that
+            have not been copied to the course yet)
+        expected_enrollment: {course_code: size}, defaults to the size of
+            each course's enrolled_students
+        """
+        if not rooms:
+            raise ValueError("At least one room is needed to build a schedule")
+        bad_rooms = sorted(name for name, capacity in rooms.items() if capacity <= 0)
+        if bad_rooms:
+            raise ValueError(f"Room capacity must be positive: {', '.join(bad_rooms)}")
+        self.courses = {course.course_code: course for course in courses}
+        self.rooms = sorted((capacity, name) for name, capacity in rooms.items())
+        self.time_slots = list(time_slots) if time_slots else default_time_slots()
+        expected_enrollment = expected_enrollment or {}
+
+        # Split courses bigger than the biggest room into sections
+        biggest_room = self.rooms[-1][0]
+        self.units = []  # [(course_code, section, size)]
+        self.units_of = {}  # {course_code: [index into self.units]}
+        for code, course in self.courses.items():
+            size = max(1, expected_enrollment.get(code, len(course.enrolled_students)))
+            sections = math.ceil(size / biggest_room)
+            for section in range(1, sections + 1):
+                self.units_of.setdefault(code, []).append(len(self.units))
+                self.units.append((code, section, math.ceil(size / sections)))
+
+        self.neighbours = self._conflict_graph(students or [])
+
+    def _conflict_graph(self, students):
+        groups = {}
+        for code, course in self.courses.items():
+            for student_id in course.enrolled_students:
+                groups.setdefault(("student", student_id), set()).add(code)
+            professor_id = _professor_id(course)
+            if professor_id is not None:
+                groups.setdefault(("professor", professor_id), set()).add(code)
+        for student in students:
+            for course in student.courses_reg:
+                code = getattr(course, "course_code", course)
+                if code in self.courses:
+                    groups.setdefault(("student", student.student_id), set()).add(code)
+
+        neighbours = {code: set() for code in self.courses}
+        for codes in groups.values():
+            for code in codes:
+                neighbours[code].update(codes)
+        for code in neighbours:
+            neighbours[code].discard(code)
+        return neighbours
+
+    def _greedy(self, rng):
+        """One DSatur pass, returns (assignments, unscheduled)."""
+        n_slots = len(self.time_slots)
+        blocked = {code: set() for code in self.courses}  # slots taken by neighbours or own sections
+        free_rooms = [list(self.rooms) for _ in range(n_slots)]
+        degree = {code: len(n) for code, n in self.neighbours.items()}
+
+        ties = [rng.random() if rng else 0 for _ in self.units]
+        placed = set()
+        assignments = {}
+        unscheduled = []
+
+        def push(i):
+            code, _, size = self.units[i]
+            heapq.heappush(heap, (-len(blocked[code]), -degree[code], -size, ties[i], i))
+
+        heap = []
+        for i in range(len(self.units)):
+            push(i)
+
+        def block(code, slot):
+            if slot not in blocked[code]:
+                blocked[code].add(slot)
+                # Saturation went up, queue the sections again with the new
+                # priority; the old heap entries are skipped as stale
+                for i in self.units_of[code]:
+                    if i not in placed:
+                        push(i)
+
+        while heap:
+            neg_sat, _, _, _, i = heapq.heappop(heap)
+            code, section, size = self.units[i]
+            if i in placed or -neg_sat != len(blocked[code]):
+                continue
+            placed.add(i)
+
+            best = None
+            for slot in range(n_slots):
+                if slot in blocked[code]:
+                    continue
+                rooms = free_rooms[slot]
+                pos = bisect.bisect_left(rooms, (size, ""))
+                if pos == len(rooms):
+                    continue
+                waste = rooms[pos][0] - size
+                if best is None or waste < best[0] or (rng and waste == best[0] and rng.random() < 0.5):
+                    best = (waste, slot, pos)
+                    if waste == 0 and not rng:
+                        break
+            if best is None:
+                unscheduled.append((code, section))
+                continue
+
+            _, slot, pos = best
+            _, room = free_rooms[slot].pop(pos)
+            assignments[(code, section)] = (self.time_slots[slot], room)
+            block(code, slot)
+            for other in self.neighbours[code]:
+                block(other, slot)
+        return assignments, unscheduled
+
+    def solve(self, time_budget=None, seed=None):
+        """Build a Timetable, spending at most time_budget seconds (roughly) on restarts."""
+        if time_budget is None:
+            time_budget = config.SCHEDULE_TIME_BUDGET
+        start = time.perf_counter()
+        deadline = start + time_budget
+        timetable = Timetable(self.time_slots)
+
+        assignments, unscheduled = self._greedy(None)
+        timetable.first_pass_time = time.perf_counter() - start
+        rng = random.Random(seed)
+        while unscheduled and time.perf_counter() < deadline:
+            timetable.restarts += 1
+            candidate, missed = self._greedy(rng)
+            if len(missed) < len(unscheduled):
+                assignments, unscheduled = candidate, missed
+
+        timetable.assignments = assignments
+        timetable.unscheduled = unscheduled
+        timetable.solve_time = time.perf_counter() - start
+        return timetable
+
+    def conflicts(self, timetable):
+        """List of broken constraints in timetable, empty if it is valid."""
+        problems = []
+        by_slot = {}
+        for (code, section), (slot, room) in timetable.assignments.items():
+            by_slot.setdefault(slot, []).append((code, section, room))
+        sizes = {(code, section): size for code, section, size in self.units}
+        capacity = {name: cap for cap, name in self.rooms}
+        for slot, entries in by_slot.items():
+            rooms_used = set()
+            codes = set()
+            for code, section, room in entries:
+                if room in rooms_used:
+                    problems.append(f"{room} double-booked at {slot}")
+                rooms_used.add(room)
+                if capacity[room] < sizes[(code, section)]:
+                    problems.append(f"{code}/{section} does not fit in {room}")
+                if code in codes:
+                    problems.append(f"two sections of {code} at {slot}")
+                codes.add(code)
+            for code in codes:
+                clash = self.neighbours[code] & codes
+                if clash:
+                    problems.append(f"{code} clashes with {sorted(clash)} at {slot}")
+        return problems
+
+
+def schedule_college(college, rooms, time_budget=None):
+    """Schedule every course of a College, see Scheduler for the details."""
+    scheduler = Scheduler(college.get_all_courses(), rooms,
+                          students=college.get_all_students())
+    return scheduler.solve(time_budget)
@@ -0,0 +1,90 @@
+# startup_bench.py
+# Measures how long a fresh `python` process takes to get the data loaded
+# through main.fast_start(), the path both the menus and the batch jobs
+# start with, and checks it against config.STARTUP_BUDGET_MS.
+#
+# Usage: python startup_bench.py [--students N] [--runs N]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import config
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_dataset(filename, n_students):
+    """Write a data file shaped like main.initialize_data() output, with n_students."""
+    students = []
+    for i in range(n_students):
+        students.append({
+            "student_id": f"S{i:06d}",
+            "name": f"Student {i}",
+            "level": i % 4 + 1,
+            "department": "Computer Science",
+            "courses_reg": ["CS101", "MATH201"],
+            "grades": {"CS101": 3.0, "MATH201": 3.7},
+            "attendance": {"CS101": [{"date": "2025-01-06", "present": True}]},
+            "version": 0,
+        })
+    data = {
+        "college": {"name": "Tech University", "departments": {}, "students": {}, "professors": {}},
+        "students": students,
+        "professors": [],
+        "departments": [],
+        "courses": [],
+    }
+    with open(filename, 'w') as file:
+        json.dump(data, file)
+
+
+def time_process(code):
+    """Wall time in ms of a fresh interpreter running code from SRC_DIR."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, check=True,
+                   stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for main.py")
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "college_data.json")
+        make_dataset(filename, args.students)
+        # Backdate the file so the cache is trusted on mtime alone
+        old = time.time() - 60
+        os.utime(filename, (old, old))
+        start_code = f"import main; main.fast_start({filename!r})"
+
+        baseline = [time_process("pass") for _ in range(args.runs)]
+        # First run has no cache and has to parse the JSON
+        first = time_process(start_code)
+        cached = [time_process(start_code) for _ in range(args.runs)]
+        eager = [time_process(f"import json; json.load(open({filename!r}))")
+                 for _ in range(args.runs)]
+
+    median = statistics.median(cached)
+    print(f"students:               {args.students}")
+    print(f"python -c pass:         {statistics.median(baseline):.1f} ms")
+    print(f"plain json.load:        {statistics.median(eager):.1f} ms")
+    print(f"fast_start (no cache):  {first:.1f} ms")
+    print(f"fast_start (cached):    {median:.1f} ms")
+    print(f"budget:                 {config.STARTUP_BUDGET_MS} ms")
+    if median > config.STARTUP_BUDGET_MS:
+        print("Over the startup budget!")
+        return 1
+    print("Within the startup budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
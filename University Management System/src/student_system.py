@@ -1,4 +1,7 @@
 # student_system.py
+from datetime import date
+
+
 class Student:
     def __init__(self, name, student_id, level, department):
         self.student_id = student_id
@@ -7,36 +10,114 @@ class Student:
         self.department = department
         self.courses_reg = []
         self.grades = {}  # {course_id: grade}
-        self.attendance = {}  # {course_id: {date: status}}
+        self.attendance = {}  # {course_id: [{'date': date, 'present': bool}]}
+        self.grade_history = []  # [{'course': course_id, 'grade': grade, 'date': date}]
+        self.version = 0  # bumped on every committed write
+        # Shared with every student of the same College once added to it,
+        # see College.attach_listeners().
+        # Called as listener(student, course_id) whenever grades change, course_id
+        # is None when no grade was given (e.g. a new registration starts at 0)
+        self.grade_listeners = []
+        # Called as listener(student, course_id, entry) for every attendance record
+        self.attendance_listeners = []
+        # Called as listener(student, course_id, entry) when a grade_history
+        # entry is taken back, see retract_grade()
+        self.grade_retracted_listeners = []
+
+    def course_codes(self):
+        # courses_reg holds Course objects once linked to a College, but
+        # plain codes when loaded with from_dict
+        return [getattr(course, "course_code", course) for course in self.courses_reg]
+
+    def _registered(self, course):
+        """The courses_reg entry for course (a Course or its code), None if not registered."""
+        for registered in self.courses_reg:
+            if getattr(registered, "course_code", registered) == course.course_code:
+                return registered
+        return None
 
     def register_course(self, course):
-        if course not in self.courses_reg:
+        if self._registered(course) is None:
             self.courses_reg.append(course)
             course.add_student(self.student_id, self.name, self.level, self.department)
             self.grades[course.course_id] = 0
-            self.attendance[course.course_id] = {}
+            # keep the history if this is a re-registration after a drop
+            self.attendance.setdefault(course.course_id, [])
+            self.grades_changed()
             print(f"Registered for {course.course_name}")
             return True
         print(f"Already registered for {course.course_name}")
         return False
     
     def drop_course(self, course):
-        if course in self.courses_reg:
-            self.courses_reg.remove(course)
+        registered = self._registered(course)
+        if registered is not None:
+            self.courses_reg.remove(registered)
             course.remove_student(self.student_id)
             print(f"Dropped {course.course_name}")
             return True
         print(f"Not registered for {course.course_name}")
         return False
     
+    def set_grade(self, course_id, grade, day=None):
+        """Give a grade, dated day ('YYYY-MM-DD', defaults to today)."""
+        entry = {
+            'course': course_id,
+            'grade': grade,
+            'date': day or date.today().isoformat()
+        }
+        self.grades[course_id] = grade
+        self.grade_history.append(entry)
+        self.grades_changed(course_id)
+        return entry
+
+    def retract_grade(self, entry, grade):
+        """
+        Take back a grade given with set_grade() that could not be saved,
+        putting grade (None for no grade) back in its place.
+        """
+        course_id = entry['course']
+        self.grade_history.remove(entry)
+        if grade is None:
+            self.grades.pop(course_id, None)
+        else:
+            self.grades[course_id] = grade
+        for listener in self.grade_retracted_listeners:
+            listener(self, course_id, entry)
+        self.grades_changed()
+
+    def grades_changed(self, course_id=None):
+        for listener in self.grade_listeners:
+            listener(self, course_id)
+
+    def add_attendance(self, course_id, date, present):
+        entry = {
+            'date': date,
+            'present': present
+        }
+        entries = self.attendance.setdefault(course_id, [])
+        entries.append(entry)
+        try:
+            for listener in self.attendance_listeners:
+                listener(self, course_id, entry)
+        except Exception:
+            # Do not keep a record the listeners (e.g. the history) never saw
+            entries.remove(entry)
+            raise
+        return entry
+
+    def gpa(self):
+        # Same as calculate_gpa() without the printing
+        if not self.grades:
+            return 0.0
+        return sum(self.grades.values()) / len(self.grades)
+
     def calculate_gpa(self):
         if not self.grades:
             print("No grades available")
             return 0.0
         
-        total = sum(self.grades.values())
-        count = len(self.grades)
-        gpa = total / count if count > 0 else 0
+        gpa = self.gpa()
         print(f"GPA: {gpa:.2f}")
         return gpa
     
@@ -52,15 +133,19 @@ class Student:
             "name": self.name,
             "level": self.level,
             "department": self.department,
-            "courses_reg": [course.course_id for course in self.courses_reg],
+            "courses_reg": self.course_codes(),
             "grades": self.grades,
-            "attendance": self.attendance
+            "attendance": self.attendance,
+            "grade_history": self.grade_history,
+            "version": self.version
         }
     def from_dict(data):
         student = Student(data['name'], data['student_id'], data['level'], data['department'])
         student.courses_reg = data['courses_reg']
         student.grades = data['grades']
         student.attendance = data['attendance']
+        student.grade_history = data.get('grade_history', [])
+        student.version = data.get('version', 0)
         return student
 
 def student_menu(student, available_courses):
@@ -0,0 +1,226 @@
+# timeseries.py
+# Attendance and grading history, rolled up by day, week and term.
+# The history itself is stored with each student (attendance lists and
+# grade_history); this is only a summary that can be rebuilt from it.
+#
+# Every event is added once to a counter per (dimension, key, period):
+# the course, the student, the student's department and the whole
+# college, each by day, by week and by term. A trend query then only
+# reads the buckets in the asked range instead of scanning every
+# student's attendance lists. Dates are stored as day numbers
+# (date.toordinal()), weeks start on Monday.
+import bisect
+from datetime import date
+from functools import lru_cache
+
+GRANULARITIES = ("day", "week", "term")
+DIMENSIONS = ("college", "department", "course", "student")
+TERM_NAMES = ("Spring", "Summer", "Fall")
+
+
+@lru_cache(maxsize=4096)
+def encode_date(value):
+    """'YYYY-MM-DD' (or a date) -> day number."""
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.toordinal()
+
+
+def decode_date(day):
+    return date.fromordinal(day)
+
+
+def _term_of(day):
+    d = date.fromordinal(day)
+    # Spring: Jan-May, Summer: Jun-Aug, Fall: Sep-Dec
+    term = 0 if d.month <= 5 else 1 if d.month <= 8 else 2
+    return d.year * 3 + term
+
+
+def bucket_of(day, granularity):
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        # Ordinal 1 (0001-01-01) is a Monday
+        return (day - 1) // 7
+    if granularity == "term":
+        return _term_of(day)
+    raise ValueError(f"Unknown granularity {granularity!r}, use one of {GRANULARITIES}")
+
+
+@lru_cache(maxsize=4096)
+def _buckets(day):
+    return tuple((granularity, bucket_of(day, granularity)) for granularity in GRANULARITIES)
+
+
+def bucket_label(bucket, granularity):
+    if granularity == "day":
+        return decode_date(bucket).isoformat()
+    if granularity == "week":
+        return "week of " + decode_date(bucket * 7 + 1).isoformat()
+    return f"{TERM_NAMES[bucket % 3]} {bucket // 3}"
+
+
+class Series:
+    """Counters for one (dimension, key, granularity), sorted by bucket."""
+
+    __slots__ = ("buckets", "values")
+
+    def __init__(self):
+        self.buckets = []  # sorted bucket numbers
+        self.values = []  # [total, count] for the bucket at the same position
+
+    def add(self, bucket, amount, count=1):
+        """Add an event to bucket, or take one back with count=-1."""
+        # History mostly arrives in date order, so check the last bucket first
+        if self.buckets and self.buckets[-1] == bucket:
+            pos = len(self.buckets) - 1
+        else:
+            pos = bisect.bisect_left(self.buckets, bucket)
+            if pos == len(self.buckets) or self.buckets[pos] != bucket:
+                self.buckets.insert(pos, bucket)
+                self.values.insert(pos, [0, 0])
+        counts = self.values[pos]
+        counts[0] += amount
+        counts[1] += count
+        if counts[1] == 0:
+            # An empty bucket would divide by zero in the trends
+            del self.buckets[pos]
+            del self.values[pos]
+
+    def range(self, first=None, last=None):
+        """[(bucket, total, count)] for first <= bucket <= last."""
+        lo = 0 if first is None else bisect.bisect_left(self.buckets, first)
+        hi = len(self.buckets) if last is None else bisect.bisect_right(self.buckets, last)
+        return [(self.buckets[i], self.values[i][0], self.values[i][1]) for i in range(lo, hi)]
+
+
+class TimeSeriesStore:
+    def __init__(self):
+        # {(metric, dimension, key, granularity): Series}
+        # metric "attendance": total = days present, count = records
+        # metric "grade": total = sum of grades, count = grades given
+        self.series = {}
+        self.college = None
+        self.skipped = 0  # malformed records left out by build()
+
+    @classmethod
+    def build(cls, college, attach=True):
+        """
+        Load the attendance and grade history of every student. Records
+        without a valid date are skipped and counted in store.skipped, so
+        one bad record does not stop the reports. Grades given before
+        grade_history was kept have no date and are not in the grade trend.
+        """
+        store = cls()
+        store.college = college
+        for student in college.students.values():
+            store.skipped += store._add_history(student, store.record_attendance, store.record_grade)
+        if attach:
+            store.attach()
+        return store
+
+    def _add_history(self, student, attendance, grade):
+        """
+        Pass every attendance record and dated grade of student to
+        attendance() and grade(), returns how many records were malformed.
+        """
+        skipped = 0
+        for course_id, entries in student.attendance.items():
+            # Older records were {date: status} dicts
+            if isinstance(entries, dict):
+                entries = [{'date': d, 'present': bool(p)} for d, p in entries.items()]
+            for entry in entries:
+                try:
+                    attendance(student, course_id, entry['date'], entry['present'])
+                except (KeyError, TypeError, ValueError):
+                    skipped += 1
+        for entry in student.grade_history:
+            try:
+                grade(student, entry['course'], float(entry['grade']), entry['date'])
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+        return skipped
+
+    def attach(self):
+        """Record every attendance mark and grade in the college from now on."""
+        self.college.attach_listeners(grade=self._on_grade, attendance=self._on_attendance,
+                                      grade_retracted=self._on_grade_retracted,
+                                      student_removed=self._on_student_removed)
+
+    def detach(self):
+        self.college.detach_listeners(grade=self._on_grade, attendance=self._on_attendance,
+                                      grade_retracted=self._on_grade_retracted,
+                                      student_removed=self._on_student_removed)
+
+    def _on_student_removed(self, student):
+        # build() skipped the malformed records, so taking them back fails the same way
+        self._add_history(student, self.retract_attendance, self.retract_grade)
+
+    def _on_attendance(self, student, course_id, entry):
+        self.record_attendance(student, course_id, entry['date'], entry['present'])
+
+    def _on_grade(self, student, course_id):
+        if course_id is None:
+            return
+        # Student.set_grade() adds the dated entry before telling listeners
+        history = student.grade_history
+        if history and history[-1]['course'] == course_id:
+            self.record_grade(student, course_id, history[-1]['grade'], history[-1]['date'])
+        else:
+            self.record_grade(student, course_id, student.grades[course_id], date.today())
+
+    def _on_grade_retracted(self, student, course_id, entry):
+        self.retract_grade(student, course_id, entry['grade'], entry['date'])
+
+    def _add(self, metric, student, course_id, day, amount, count=1):
+        keys = (
+            ("college", None),
+            ("department", student.department),
+            ("course", course_id),
+            ("student", student.student_id),
+        )
+        all_series = self.series
+        for granularity, bucket in _buckets(day):
+            for dimension, key in keys:
+                name = (metric, dimension, key, granularity)
+                series = all_series.get(name)
+                if series is None:
+                    series = all_series[name] = Series()
+                series.add(bucket, amount, count)
+
+    def record_attendance(self, student, course_id, when, present):
+        self._add("attendance", student, course_id, encode_date(when), 1 if present else 0)
+
+    def retract_attendance(self, student, course_id, when, present):
+        """Take back a record added with record_attendance()."""
+        self._add("attendance", student, course_id, encode_date(when), -1 if present else 0, -1)
+
+    def record_grade(self, student, course_id, grade, when):
+        self._add("grade", student, course_id, encode_date(when), grade)
+
+    def retract_grade(self, student, course_id, grade, when):
+        """Take back a grade added with record_grade()."""
+        self._add("grade", student, course_id, encode_date(when), -grade, -1)
+
+    def _query(self, metric, by, key, granularity, start, end):
+        if by not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension {by!r}, use one of {DIMENSIONS}")
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity {granularity!r}, use one of {GRANULARITIES}")
+        series = self.series.get((metric, by, key, granularity))
+        if series is None:
+            return []
+        first = None if start is None else bucket_of(encode_date(start), granularity)
+        last = None if end is None else bucket_of(encode_date(end), granularity)
+        return series.range(first, last)
+
+    def attendance_trend(self, by="course", key=None, granularity="week", start=None, end=None):
+        """[(label, present, records, rate)] between start and end (inclusive)."""
+        return [(bucket_label(bucket, granularity), present, count, present / count)
+                for bucket, present, count in self._query("attendance", by, key, granularity, start, end)]
+
+    def grade_trend(self, by="course", key=None, granularity="term", start=None, end=None):
+        """[(label, average grade, grades given)] between start and end (inclusive)."""
+        return [(bucket_label(bucket, granularity), total / count, count)
+                for bucket, total, count in self._query("grade", by, key, granularity, start, end)]